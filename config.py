@@ -17,6 +17,14 @@ class Config:
     TEST_SIZE = 0.2
     VALIDATION_SPLIT = 0.2
     
+    # Undersampling keeps UNDERSAMPLE_RATIO normal rows per fraud row
+    UNDERSAMPLE_RATIO = 2
+    
+    # Streaming load used for undersampling (keeps all fraud rows + a sample of normal rows).
+    # The sample is sized from the class counts, with a margin for per-chunk rounding
+    LOAD_CHUNKSIZE = 50000
+    MAJORITY_SAMPLE_MARGIN = 1.5
+    
     # Neural Network Architecture
     INPUT_DIM = 30
     HIDDEN_LAYERS = [64, 32]
@@ -29,6 +37,27 @@ class Config:
     LEARNING_RATE = 0.001
     EARLY_STOPPING_PATIENCE = 10
     
+    # Online inference micro-batching (coalesces concurrent predict_single calls)
+    MICRO_BATCHING = True
+    INFERENCE_BATCH_SIZE = 32
+    BATCH_TIMEOUT_US = 1000
+    
+    # Web app: LRU cache of single-transaction predictions keyed on the 30 input features
+    PREDICTION_CACHE_SIZE = 4096
+    
+    # Web app: seconds the dashboard's statistics and recent transactions are cached
+    DASHBOARD_CACHE_TTL = 15.0
+    
+    # Web app: /predict rows are queued and written in batches by a background
+    # thread; SYNC_WRITES=1 commits each request before responding instead
+    SYNC_WRITES = os.getenv('SYNC_WRITES', '0') == '1'
+    WRITE_BATCH_SIZE = 100
+    WRITE_FLUSH_MS = 50
+    
+    # TensorFlow CPU threading (a 30-64-32-1 MLP gains nothing from one thread per core)
+    INTRA_THREADS = 4
+    INTER_THREADS = 2
+    
     # Database configuration
     DB_TYPE = 'sqlite'  # Change to 'postgresql' for production
     
@@ -54,12 +83,15 @@ class Config:
     FLASK_HOST = '0.0.0.0'
     FLASK_PORT = 5000
     DEBUG = True
+    SEND_FILE_MAX_AGE_DEFAULT = 3600  # Browser cache lifetime (seconds) for /static files
     
     # Model saving
     MODEL_SAVE_PATH = os.path.join(MODEL_DIR, 'fraud_detection_model.h5')
     SCALER_SAVE_PATH = os.path.join(MODEL_DIR, 'scaler.pkl')
+    TFLITE_SAVE_PATH = os.path.join(MODEL_DIR, 'fraud_detection_model.tflite')
     
     # Model loading (for predictions)
     MODEL_PATH = MODEL_SAVE_PATH
     SCALER_PATH = SCALER_SAVE_PATH
+    TFLITE_PATH = TFLITE_SAVE_PATH  # Used instead of MODEL_PATH when present (src/quantize.py)
     HISTORY_SAVE_PATH = os.path.join(MODEL_DIR, 'training_history.pkl')
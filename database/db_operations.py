@@ -4,39 +4,87 @@ Handles CRUD operations for transactions and predictions
 """
 
 from datetime import datetime
+import numpy as np
+import atexit
+import logging
+import queue
+import threading
+import time
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database.db_setup import Transaction, PredictionLog, User, get_session, create_database, Base
-from sqlalchemy import create_engine
-from config import Config
+from database.db_setup import Transaction, PredictionLog, User, get_session, create_database, migrate_transactions_table, Base, _get_engine
+from sqlalchemy import func, case, select, insert, update
+
+logger = logging.getLogger(__name__)
 
 # Ensure tables exist when module is loaded
 _tables_ensured = False
 
+# Short-lived cache for get_statistics (shared by all DatabaseOperations instances).
+# Request threads and the TransactionWriter thread both invalidate it, hence the lock;
+# 'gen' counts invalidations so a refresh that raced with one isn't stored
+_STATS_TTL = 10.0
+_stats_cache = {'ts': 0.0, 'val': None, 'gen': 0}
+_stats_lock = threading.Lock()
+
+
+def invalidate_stats_cache():
+    """Force the next get_statistics call to hit the database"""
+    with _stats_lock:
+        _stats_cache['gen'] += 1
+        _stats_cache['ts'] = 0.0
+        _stats_cache['val'] = None
+
+
 def ensure_tables_exist():
     """Make absolutely sure tables exist before any operation"""
     global _tables_ensured
     if not _tables_ensured:
         try:
-            config = Config()
-            engine = create_engine(config.DATABASE_URI)
-            Base.metadata.create_all(engine, checkfirst=True)
+            Base.metadata.create_all(_get_engine(), checkfirst=True)
+            migrate_transactions_table(_get_engine())
             _tables_ensured = True
             print("✓ Database tables verified/created")
         except Exception as e:
             print(f"WARNING: Could not ensure tables exist: {e}")
 
 
+V_COLUMNS = [f'v{i}' for i in range(1, 29)]
+
+
+def pack_v_features(transaction_data):
+    """
+    Replace the v1-v28 keys of a transaction dict with the packed v_pca blob
+    
+    Args:
+        transaction_data (dict): Transaction details with v1-v28 keys
+        
+    Returns:
+        dict: Transaction details ready for the transactions table
+    """
+    if 'v_pca' in transaction_data:
+        return transaction_data
+    row = {k: v for k, v in transaction_data.items() if k not in V_COLUMNS}
+    v = np.array([transaction_data.get(k, 0.0) for k in V_COLUMNS], dtype=np.float32)
+    row['v_pca'] = v.tobytes()
+    return row
+
+
 class DatabaseOperations:
     """
     Handles all database operations
     """
     
-    def __init__(self):
+    def __init__(self, session=None):
+        """
+        Args:
+            session (Session): Session to use (e.g. a request-scoped session
+                owned by the caller); a new one is created if not given
+        """
         ensure_tables_exist()  # Make sure tables exist before ANY operation
-        self.session = get_session()
+        self.session = session if session is not None else get_session()
     
     def add_transaction(self, transaction_data):
         """
@@ -48,11 +96,67 @@ class DatabaseOperations:
         Returns:
             Transaction: Created transaction object
         """
-        transaction = Transaction(**transaction_data)
+        transaction = Transaction(**pack_v_features(transaction_data))
+        self.session.add(transaction)
+        self.session.commit()
+        invalidate_stats_cache()
+        return transaction
+    
+    def add_transaction_with_log(self, transaction_data, log_data):
+        """
+        Add a transaction and its prediction log entry in a single commit
+        
+        Args:
+            transaction_data (dict): Transaction details
+            log_data (dict): Prediction log details (transaction_id is filled in)
+            
+        Returns:
+            Transaction: Created transaction object
+        """
+        transaction = Transaction(**pack_v_features(transaction_data))
         self.session.add(transaction)
+        self.session.flush()  # Assigns transaction.id without committing
+        
+        self.session.add(PredictionLog(**{**log_data, 'transaction_id': transaction.id}))
         self.session.commit()
+        invalidate_stats_cache()
         return transaction
     
+    def add_transactions_with_logs_bulk(self, pairs):
+        """
+        Add many transactions and their prediction log entries in a single commit
+        
+        Args:
+            pairs (list): List of (transaction_data, log_data) dict pairs, as
+                passed to add_transaction_with_log
+        """
+        # RETURNING in parameter order gives each log row its transaction's id
+        transaction_ids = self.session.execute(
+            insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+            [pack_v_features(transaction_data) for transaction_data, _ in pairs]
+        ).scalars().all()
+        self.session.execute(
+            insert(PredictionLog),
+            [{**log_data, 'transaction_id': transaction_id}
+             for (_, log_data), transaction_id in zip(pairs, transaction_ids)]
+        )
+        self.session.commit()
+        invalidate_stats_cache()
+    
+    def add_transactions_bulk(self, rows, batch_size=1000):
+        """
+        Add many transactions in one database transaction
+        
+        Args:
+            rows (list): List of transaction dicts (same keys as add_transaction)
+            batch_size (int): Number of rows per multi-row INSERT
+        """
+        rows = [pack_v_features(row) for row in rows]
+        for i in range(0, len(rows), batch_size):
+            self.session.execute(insert(Transaction), rows[i:i + batch_size])
+        self.session.commit()
+        invalidate_stats_cache()
+    
     def get_transaction(self, transaction_id):
         """
         Get a transaction by ID
@@ -77,6 +181,28 @@ class DatabaseOperations:
         """
         return self.session.query(Transaction).order_by(Transaction.created_at.desc()).limit(limit).all()
     
+    def iter_recent_transactions(self, limit=100, batch_size=200):
+        """
+        Stream the most recent transactions' summary columns (no V1-V28 blob)
+        
+        Args:
+            limit (int): Maximum number of transactions to return
+            batch_size (int): Rows fetched from the database at a time
+            
+        Returns:
+            Iterator of rows with id, amount, time, is_fraud, fraud_probability,
+            risk_level and created_at attributes
+        """
+        return self.session.query(
+            Transaction.id,
+            Transaction.amount,
+            Transaction.time,
+            Transaction.is_fraud,
+            Transaction.fraud_probability,
+            Transaction.risk_level,
+            Transaction.created_at
+        ).order_by(Transaction.created_at.desc()).limit(limit).yield_per(batch_size)
+    
     def get_fraud_transactions(self, limit=100):
         """
         Get all fraudulent transactions
@@ -97,13 +223,18 @@ class DatabaseOperations:
             transaction_id (int): Transaction ID
             prediction_result (dict): Prediction results
         """
-        transaction = self.get_transaction(transaction_id)
-        if transaction:
-            transaction.is_fraud = prediction_result['is_fraud']
-            transaction.fraud_probability = prediction_result['fraud_probability']
-            transaction.risk_level = prediction_result['risk_level']
-            transaction.updated_at = datetime.utcnow()
-            self.session.commit()
+        self.session.execute(
+            update(Transaction)
+            .where(Transaction.id == transaction_id)
+            .values(
+                is_fraud=prediction_result['is_fraud'],
+                fraud_probability=prediction_result['fraud_probability'],
+                risk_level=prediction_result['risk_level'],
+                updated_at=datetime.utcnow()
+            )
+        )
+        self.session.commit()
+        invalidate_stats_cache()
     
     def add_prediction_log(self, log_data):
         """
@@ -118,8 +249,22 @@ class DatabaseOperations:
         log = PredictionLog(**log_data)
         self.session.add(log)
         self.session.commit()
+        invalidate_stats_cache()
         return log
     
+    def add_prediction_logs_bulk(self, rows, batch_size=1000):
+        """
+        Add many prediction log entries in one database transaction
+        
+        Args:
+            rows (list): List of log dicts (same keys as add_prediction_log)
+            batch_size (int): Number of rows per multi-row INSERT
+        """
+        for i in range(0, len(rows), batch_size):
+            self.session.execute(insert(PredictionLog), rows[i:i + batch_size])
+        self.session.commit()
+        invalidate_stats_cache()
+    
     def get_prediction_logs(self, limit=100):
         """
         Get recent prediction logs
@@ -134,14 +279,24 @@ class DatabaseOperations:
     
     def get_statistics(self):
         """
-        Get database statistics
+        Get database statistics (cached for _STATS_TTL seconds)
         
         Returns:
             dict: Statistics dictionary
         """
-        total_transactions = self.session.query(Transaction).count()
-        total_fraud = self.session.query(Transaction).filter_by(is_fraud=True).count()
-        total_predictions = self.session.query(PredictionLog).count()
+        now = time.monotonic()
+        with _stats_lock:
+            cached, cached_ts, gen = _stats_cache['val'], _stats_cache['ts'], _stats_cache['gen']
+        if cached is not None and now - cached_ts < _STATS_TTL:
+            return dict(cached)
+        
+        # One round-trip: conditional aggregation over transactions plus the log count
+        total_transactions, total_fraud, total_predictions = self.session.query(
+            func.count(Transaction.id),
+            func.sum(case((Transaction.is_fraud == True, 1), else_=0)),
+            select(func.count(PredictionLog.id)).scalar_subquery()
+        ).one()
+        total_fraud = total_fraud or 0
         
         stats = {
             'total_transactions': total_transactions,
@@ -151,13 +306,119 @@ class DatabaseOperations:
             'total_predictions': total_predictions
         }
         
-        return stats
+        with _stats_lock:
+            if _stats_cache['gen'] == gen:
+                _stats_cache['val'] = stats
+                _stats_cache['ts'] = now
+        
+        return dict(stats)
     
     def close(self):
         """Close database session"""
         self.session.close()
 
 
+class TransactionWriter:
+    """
+    Write-behind queue for (transaction, prediction log) pairs.
+    
+    Callers enqueue and return immediately; a background worker collects up to
+    batch_size pairs (waiting at most flush_ms after the first one) and writes
+    them with one session and a single commit. A failed batch is retried up to
+    max_attempts times before it is dropped and counted in `dropped`. Rows
+    still queued when the process exits are flushed by an atexit hook; a hard
+    crash loses at most the batch in flight.
+    """
+    
+    def __init__(self, batch_size=100, flush_ms=50, on_flush=None, max_attempts=3, retry_delay=0.5):
+        self._batch_size = batch_size
+        self._timeout = flush_ms / 1000.0
+        self._on_flush = on_flush
+        self._max_attempts = max_attempts
+        self._retry_delay = retry_delay
+        self.dropped = 0
+        self._start()
+        
+        # Threads don't survive fork(): give each forked child (e.g. a gunicorn
+        # worker forked from a preloaded master) its own queue and worker
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._start)
+        atexit.register(self.flush)
+    
+    def _start(self):
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='fraud-db-writer', daemon=True)
+        self._thread.start()
+    
+    def submit(self, transaction_data, log_data):
+        """
+        Queue a transaction and its prediction log entry for writing
+        
+        Args:
+            transaction_data (dict): Transaction details
+            log_data (dict): Prediction log details (transaction_id is filled in)
+        """
+        self._queue.put((transaction_data, log_data))
+    
+    def flush(self, timeout=5.0):
+        """
+        Write everything queued so far and wait for the commit
+        
+        Args:
+            timeout (float): Maximum seconds to wait
+            
+        Returns:
+            bool: True if the queue was drained within the timeout
+        """
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+    
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + self._timeout
+            while len(items) < self._batch_size and not isinstance(items[-1], threading.Event):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            pairs = [item for item in items if not isinstance(item, threading.Event)]
+            if pairs:
+                self._write(pairs)
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+    
+    def _write(self, pairs):
+        for attempt in range(1, self._max_attempts + 1):
+            db_ops = DatabaseOperations()
+            try:
+                db_ops.add_transactions_with_logs_bulk(pairs)
+            except Exception:
+                db_ops.session.rollback()
+                logger.exception("Writing %d queued transactions failed (attempt %d/%d)",
+                                 len(pairs), attempt, self._max_attempts)
+                if attempt < self._max_attempts:
+                    time.sleep(self._retry_delay * attempt)
+                continue
+            finally:
+                db_ops.close()
+            
+            if self._on_flush is not None:
+                self._on_flush()
+            return True
+        
+        self.dropped += len(pairs)
+        logger.error("Dropped %d queued transactions after %d failed attempts (%d dropped so far)",
+                     len(pairs), self._max_attempts, self.dropped)
+        return False
+
+
 if __name__ == "__main__":
     # Test database operations
     db_ops = DatabaseOperations()
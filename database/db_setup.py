@@ -3,10 +3,11 @@ Database setup script for Credit Card Fraud Detection System
 Creates necessary tables and schema
 """
 
-from sqlalchemy import create_engine, Column, Integer, Float, String, DateTime, Boolean, Text
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, Float, String, DateTime, Boolean, Text, LargeBinary, Index
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
 from datetime import datetime
+import numpy as np
 import sys
 import os
 
@@ -15,49 +16,31 @@ from config import Config
 
 Base = declarative_base()
 
+# Shared engine and session factory, created on first use
+_engine = None
+_Session = None
+
 
 class Transaction(Base):
     """
     Transaction table to store credit card transactions
     """
     __tablename__ = 'transactions'
+    __table_args__ = (
+        # Serve "latest N" and "latest N fraud" queries from the index instead of a sort
+        Index('ix_txn_created_desc', 'created_at'),
+        Index('ix_txn_fraud_created', 'is_fraud', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     time = Column(Float, nullable=False)
     amount = Column(Float, nullable=False)
     
-    # PCA features V1-V28
-    v1 = Column(Float)
-    v2 = Column(Float)
-    v3 = Column(Float)
-    v4 = Column(Float)
-    v5 = Column(Float)
-    v6 = Column(Float)
-    v7 = Column(Float)
-    v8 = Column(Float)
-    v9 = Column(Float)
-    v10 = Column(Float)
-    v11 = Column(Float)
-    v12 = Column(Float)
-    v13 = Column(Float)
-    v14 = Column(Float)
-    v15 = Column(Float)
-    v16 = Column(Float)
-    v17 = Column(Float)
-    v18 = Column(Float)
-    v19 = Column(Float)
-    v20 = Column(Float)
-    v21 = Column(Float)
-    v22 = Column(Float)
-    v23 = Column(Float)
-    v24 = Column(Float)
-    v25 = Column(Float)
-    v26 = Column(Float)
-    v27 = Column(Float)
-    v28 = Column(Float)
+    # PCA features V1-V28, packed as 28 float32 values (112 bytes)
+    v_pca = Column(LargeBinary, nullable=False)
     
     # Prediction results
-    is_fraud = Column(Boolean, nullable=True)
+    is_fraud = Column(Boolean, nullable=True, index=True)
     fraud_probability = Column(Float, nullable=True)
     risk_level = Column(String(20), nullable=True)
     
@@ -65,6 +48,15 @@ class Transaction(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    def get_v(self):
+        """
+        Unpack the PCA features
+        
+        Returns:
+            np.ndarray: V1-V28 as a float32 array
+        """
+        return np.frombuffer(self.v_pca, dtype=np.float32)
+    
     def __repr__(self):
         return f"<Transaction(id={self.id}, amount={self.amount}, is_fraud={self.is_fraud})>"
 
@@ -80,7 +72,7 @@ class PredictionLog(Base):
     is_fraud = Column(Boolean, nullable=False)
     fraud_probability = Column(Float, nullable=False)
     risk_level = Column(String(20), nullable=False)
-    prediction_time = Column(DateTime, default=datetime.utcnow)
+    prediction_time = Column(DateTime, default=datetime.utcnow, index=True)
     model_version = Column(String(50), nullable=True)
     
     def __repr__(self):
@@ -127,11 +119,12 @@ def create_database():
             os.makedirs(db_dir, exist_ok=True)
             print(f"Created directory: {db_dir}")
     
-    engine = create_engine(config.DATABASE_URI, echo=False)  # Turn off echo for cleaner logs
+    engine = _get_engine()
     
     # Create all tables - this is idempotent (safe to call multiple times)
     print("\nCreating tables...")
     Base.metadata.create_all(engine, checkfirst=True)
+    migrate_transactions_table(engine)
     
     print("\n" + "="*70)
     print("DATABASE SETUP COMPLETED!")
@@ -142,7 +135,6 @@ def create_database():
     print("3. users - User authentication (future)")
     
     # Verify tables were created
-    from sqlalchemy import inspect
     inspector = inspect(engine)
     table_names = inspector.get_table_names()
     print(f"\nVerified tables in database: {table_names}")
@@ -150,6 +142,101 @@ def create_database():
     return engine
 
 
+def migrate_transactions_table(engine):
+    """
+    Upgrade a transactions table created before V1-V28 were packed into v_pca
+    
+    create_all() leaves existing tables alone, so an older database keeps its
+    v1..v28 columns and every insert of the current model would fail. The old
+    values are packed into a new v_pca column (the v1..v28 columns are nullable
+    and stay in place), and indexes added since are created.
+    
+    Args:
+        engine (Engine): Database engine
+        
+    Returns:
+        bool: True if the table was migrated
+    """
+    inspector = inspect(engine)
+    if 'transactions' not in inspector.get_table_names():
+        return False
+    columns = {column['name'] for column in inspector.get_columns('transactions')}
+    if 'v_pca' in columns:
+        return False
+    
+    v_columns = [f'v{i}' for i in range(1, 29)]
+    missing = [c for c in v_columns if c not in columns]
+    if missing:
+        raise RuntimeError(
+            f"transactions table has no v_pca column and is missing {missing}; "
+            "it can't be migrated - drop it or point the app at a new database"
+        )
+    
+    print("Migrating transactions table: packing v1..v28 into v_pca...")
+    blob_type = LargeBinary().compile(dialect=engine.dialect)
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE transactions ADD COLUMN v_pca {blob_type}"))
+        rows = conn.execute(text(f"SELECT id, {', '.join(v_columns)} FROM transactions")).all()
+        if rows:
+            # NULL features count as 0, like missing features in a request
+            values = np.nan_to_num(np.array([row[1:] for row in rows], dtype=np.float64)).astype(np.float32)
+            conn.execute(
+                text("UPDATE transactions SET v_pca = :v_pca WHERE id = :id"),
+                [{'id': row[0], 'v_pca': v.tobytes()} for row, v in zip(rows, values)]
+            )
+    
+    for index in Transaction.__table__.indexes:
+        index.create(engine, checkfirst=True)
+    print(f"✓ Migrated {len(rows)} transactions")
+    return True
+
+
+def _set_sqlite_pragmas(dbapi_conn, connection_record):
+    """
+    Configure each new SQLite connection for concurrent access
+    (WAL journal so readers don't block on writers, plus a busy timeout)
+    """
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.close()
+
+
+def _get_engine():
+    """
+    Get the shared database engine, creating it on first use
+    
+    Returns:
+        Engine: SQLAlchemy engine (one connection pool per process)
+    """
+    global _engine
+    if _engine is None:
+        config = Config()
+        if config.DB_TYPE == 'postgresql':
+            # LIFO keeps recently used (warm) connections busy; pre-ping drops dead ones
+            _engine = create_engine(
+                config.DATABASE_URI,
+                echo=False,
+                pool_size=10,
+                max_overflow=20,
+                pool_use_lifo=True,
+                pool_pre_ping=True,
+                pool_recycle=1800
+            )
+        else:
+            engine_kwargs = {'connect_args': {'check_same_thread': False}}
+            if config.SQLITE_DB_PATH == ':memory:':
+                # Every connection to :memory: is a new database, so share one
+                engine_kwargs['poolclass'] = StaticPool
+            else:
+                engine_kwargs.update(pool_pre_ping=True, pool_use_lifo=True)
+            _engine = create_engine(config.DATABASE_URI, echo=False, **engine_kwargs)
+            event.listen(_engine, 'connect', _set_sqlite_pragmas)
+    return _engine
+
+
 def get_session():
     """
     Create a database session
@@ -157,10 +244,10 @@ def get_session():
     Returns:
         Session: SQLAlchemy session object
     """
-    config = Config()
-    engine = create_engine(config.DATABASE_URI)
-    Session = sessionmaker(bind=engine)
-    return Session()
+    global _Session
+    if _Session is None:
+        _Session = sessionmaker(bind=_get_engine())
+    return _Session()
 
 
 if __name__ == "__main__":
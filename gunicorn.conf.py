@@ -0,0 +1,58 @@
+"""
+Gunicorn configuration (picked up automatically by `gunicorn web.app:app`)
+
+The app is imported once in the master process and workers are forked from it,
+so code, config and - where it is safe to share across fork() - the loaded
+predictor are shared copy-on-write instead of being rebuilt in every worker.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config import Config
+
+# Importing the app must not load the model yet, whatever WARM_START the environment
+# sets: a TensorFlow model loaded before fork() hangs the workers. when_ready/post_fork
+# decide where it loads
+os.environ['WARM_START'] = '0'
+
+preload_app = True
+
+
+def _predictor_fork_safe():
+    """
+    The TensorFlow runtime can't be used in a process forked after it started,
+    but the TFLite interpreter and the demo predictor can
+    """
+    config = Config()
+    if os.path.exists(config.TFLITE_PATH):
+        return True
+    return not (os.path.exists(config.MODEL_PATH) and os.path.exists(config.SCALER_PATH))
+
+
+def when_ready(server):
+    """Load the predictor in the master so forked workers share it"""
+    if _predictor_fork_safe():
+        from web.app import get_predictor
+        get_predictor()
+    else:
+        server.log.info("Full TensorFlow model: loading it in each worker after fork")
+
+
+def post_fork(server, worker):
+    """Per-worker setup right after fork, before any request is handled"""
+    # Don't share the master's pooled database connections with the workers
+    from database.db_setup import _get_engine
+    _get_engine().dispose(close=False)
+    
+    # No-op if the master already loaded the predictor; otherwise load it before serving
+    from web.app import get_predictor
+    get_predictor()
+
+
+def worker_exit(server, worker):
+    """Write any queued /predict rows before the worker goes away"""
+    from web.app import WRITER
+    if WRITER is not None and not WRITER.flush():
+        server.log.warning("Timed out flushing queued database writes")
@@ -7,7 +7,6 @@ import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.utils import resample
 import joblib
 import sys
 import os
@@ -26,12 +25,14 @@ class DataPreprocessor:
         self.config = Config()
         self.scaler = StandardScaler()
         
-    def load_data(self, filepath=None):
+    def load_data(self, filepath=None, majority_per_fraud=None):
         """
         Load the credit card dataset
         
         Args:
             filepath (str): Path to the CSV file
+            majority_per_fraud (float): If set, stream the file in chunks and keep
+                all fraud rows but only about this many normal rows per fraud row
             
         Returns:
             pd.DataFrame: Loaded dataset
@@ -41,8 +42,15 @@ class DataPreprocessor:
             
         print(f"Loading data from {filepath}...")
         
+        # float32 features halve memory and scaling cost vs. the float64 default
+        dtype = {col: np.float32 for col in ['Time', 'Amount'] + [f'V{i}' for i in range(1, 29)]}
+        dtype['Class'] = np.int8
+        
         try:
-            df = pd.read_csv(filepath)
+            if majority_per_fraud is None:
+                df = pd.read_csv(filepath, dtype=dtype, engine='c')
+            else:
+                df = self._load_sampled(filepath, dtype, majority_per_fraud)
             print(f"Data loaded successfully! Shape: {df.shape}")
             return df
         except FileNotFoundError:
@@ -52,6 +60,35 @@ class DataPreprocessor:
             print(f"And place it in: {self.config.DATA_DIR}")
             return None
     
+    def _load_sampled(self, filepath, dtype, majority_per_fraud):
+        """
+        Stream the CSV and keep only the rows undersampling can use
+        
+        Args:
+            filepath (str): Path to the CSV file
+            dtype (dict): Column dtypes
+            majority_per_fraud (float): Normal rows to keep per fraud row
+            
+        Returns:
+            pd.DataFrame: All fraud rows plus a sample of normal rows
+        """
+        # Cheap first pass over the label column sizes the sample for this dataset
+        labels = pd.read_csv(filepath, usecols=['Class'], dtype={'Class': np.int8}, engine='c')['Class'].to_numpy()
+        n_fraud = int(np.count_nonzero(labels == 1))
+        n_normal = len(labels) - n_fraud
+        majority_frac = min(1.0, majority_per_fraud * n_fraud / n_normal) if n_normal else 1.0
+        print(f"Sampling {majority_frac:.2%} of {n_normal} normal rows ({n_fraud} fraud rows)")
+        
+        rng = np.random.default_rng(self.config.RANDOM_SEED)
+        minority, majority_samples = [], []
+        
+        for chunk in pd.read_csv(filepath, dtype=dtype, engine='c', chunksize=self.config.LOAD_CHUNKSIZE):
+            is_fraud = chunk['Class'] == 1
+            minority.append(chunk[is_fraud])
+            majority_samples.append(chunk[~is_fraud].sample(frac=majority_frac, random_state=rng))
+        
+        return pd.concat(minority + majority_samples, ignore_index=True)
+    
     def explore_data(self, df):
         """
         Display basic statistics and information about the dataset
@@ -95,37 +132,42 @@ class DataPreprocessor:
         if method == 'none':
             return df
         
-        # Separate majority and minority classes
-        df_majority = df[df['Class'] == 0]
-        df_minority = df[df['Class'] == 1]
+        # Work on row positions so the frame is only copied once at the end
+        rng = np.random.default_rng(self.config.RANDOM_SEED)
+        labels = df['Class'].to_numpy()
+        majority_idx = np.flatnonzero(labels == 0)
+        minority_idx = np.flatnonzero(labels == 1)
         
         print(f"\nOriginal class distribution:")
-        print(f"Normal: {len(df_majority)}, Fraud: {len(df_minority)}")
+        print(f"Normal: {len(majority_idx)}, Fraud: {len(minority_idx)}")
         
         if method == 'undersample':
             # Undersample majority class
-            df_majority_downsampled = resample(
-                df_majority,
-                replace=False,
-                n_samples=len(df_minority) * 2,  # 2:1 ratio
-                random_state=self.config.RANDOM_SEED
+            ratio = self.config.UNDERSAMPLE_RATIO
+            if len(majority_idx) < len(minority_idx) * ratio:
+                print(f"WARNING: Only {len(majority_idx)} normal rows for {len(minority_idx)} fraud rows; "
+                      f"keeping all of them (below the {ratio}:1 ratio)")
+            majority_idx = rng.choice(
+                majority_idx,
+                size=min(len(minority_idx) * ratio, len(majority_idx)),
+                replace=False
             )
-            df_balanced = pd.concat([df_majority_downsampled, df_minority])
             
         elif method == 'oversample':
             # Oversample minority class
-            df_minority_upsampled = resample(
-                df_minority,
-                replace=True,
-                n_samples=len(df_majority) // 100,  # 1:100 ratio
-                random_state=self.config.RANDOM_SEED
+            minority_idx = rng.choice(
+                minority_idx,
+                size=len(majority_idx) // 100,  # 1:100 ratio
+                replace=True
             )
-            df_balanced = pd.concat([df_majority, df_minority_upsampled])
         
         print(f"Balanced class distribution:")
-        print(f"Normal: {len(df_balanced[df_balanced['Class']==0])}, Fraud: {len(df_balanced[df_balanced['Class']==1])}")
+        print(f"Normal: {len(majority_idx)}, Fraud: {len(minority_idx)}")
         
-        return df_balanced.sample(frac=1, random_state=self.config.RANDOM_SEED).reset_index(drop=True)
+        all_idx = np.concatenate([majority_idx, minority_idx])
+        rng.shuffle(all_idx)
+        
+        return df.iloc[all_idx].reset_index(drop=True)
     
     def scale_features(self, X_train, X_test):
         """
@@ -147,23 +189,30 @@ class DataPreprocessor:
         
         return X_train_scaled, X_test_scaled
     
-    def prepare_data(self, balance_method='undersample'):
+    def prepare_data(self, balance_method='undersample', verbose=False):
         """
         Complete data preparation pipeline
         
         Args:
             balance_method (str): Method to handle class imbalance
+            verbose (bool): Print dataset exploration (full-frame statistics)
             
         Returns:
             tuple: X_train, X_test, y_train, y_test
         """
-        # Load data
-        df = self.load_data()
+        # Load data (undersampling only needs a fraction of the normal rows)
+        if balance_method == 'undersample':
+            df = self.load_data(
+                majority_per_fraud=self.config.UNDERSAMPLE_RATIO * self.config.MAJORITY_SAMPLE_MARGIN
+            )
+        else:
+            df = self.load_data()
         if df is None:
             return None, None, None, None
         
         # Explore data
-        self.explore_data(df)
+        if verbose:
+            self.explore_data(df)
         
         # Handle imbalance
         df = self.handle_imbalance(df, method=balance_method)
@@ -205,15 +254,19 @@ class DataPreprocessor:
             FileNotFoundError: If scaler file not found
         """
         scaler_path = self.config.SCALER_SAVE_PATH
-        if not os.path.exists(scaler_path):
+        try:
+            scaler = joblib.load(scaler_path)
+        except FileNotFoundError:
             raise FileNotFoundError(f"Scaler file not found at {scaler_path}")
-        return joblib.load(scaler_path)
+        # Cached for src.fast_scaler.apply_scaler on the serving path
+        scaler.inv_scale_ = 1.0 / scaler.scale_
+        return scaler
 
 
 if __name__ == "__main__":
     # Test the preprocessing
     preprocessor = DataPreprocessor()
-    X_train, X_test, y_train, y_test = preprocessor.prepare_data()
+    X_train, X_test, y_train, y_test = preprocessor.prepare_data(verbose=True)
     
     if X_train is not None:
         print("\n" + "="*50)
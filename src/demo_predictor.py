@@ -3,6 +3,8 @@ Lightweight demo predictor for when the full model is not available.
 Uses statistical patterns and rule-based logic to simulate predictions.
 """
 
+import math
+
 import numpy as np
 
 
@@ -12,10 +14,23 @@ class DemoFraudPredictor:
     Uses statistical patterns to provide realistic fraud predictions.
     """
     
+    # Risk level buckets: [0, 0.25) Low, [0.25, 0.5) Medium, [0.5, 0.75) High, [0.75, 1] Critical
+    _LEVEL_BOUNDS = np.array([0.25, 0.50, 0.75])
+    _LEVEL_NAMES = np.array(['Low', 'Medium', 'High', 'Critical'])
+    
+    # Feature keys (built once) and positions of the key fraud indicators
+    _ALL_V_KEYS = tuple(f'V{i}' for i in range(1, 29))
+    _FEATURE_KEYS = _ALL_V_KEYS + ('Amount', 'Time')
+    _HIGH_V_KEYS = ('V1', 'V3', 'V4', 'V10', 'V12', 'V14')
+    _HIGH_IDX = np.array([int(k[1:]) - 1 for k in _HIGH_V_KEYS])
+    
     def __init__(self):
         """Initialize demo predictor with statistical thresholds"""
         self.is_demo_mode = True
         
+        # Per-instance generator (no global RandomState lock on every draw)
+        self._rng = np.random.default_rng()
+        
         # Statistical thresholds derived from fraud patterns
         self.high_amount_threshold = 1000
         self.suspicious_patterns = {
@@ -40,18 +55,13 @@ class DemoFraudPredictor:
         Returns:
             dict: Prediction results
         """
-        # Convert to dict if array
-        if not isinstance(transaction_data, dict):
-            # Assume it's in order: V1-V28, Amount, Time
-            transaction_data = {f'V{i}': transaction_data[i] for i in range(28)}
-            transaction_data['Amount'] = transaction_data[28] if len(transaction_data) > 28 else 0
-            transaction_data['Time'] = transaction_data[29] if len(transaction_data) > 29 else 0
+        x = self._to_feature_array(transaction_data)
         
         # Calculate fraud score based on statistical patterns
         fraud_score = 0.0
         
         # 1. Check amount (higher amounts have higher fraud risk)
-        amount = transaction_data.get('Amount', 0)
+        amount = float(x[28])
         if amount > self.high_amount_threshold:
             fraud_score += 0.25  # Increased from 0.15
         elif amount > 500:
@@ -62,24 +72,15 @@ class DemoFraudPredictor:
             fraud_score += 0.10  # Increased - very small can be tests
         
         # 2. Check PCA components for anomalies (these are KEY fraud indicators)
-        suspicious_count = 0
+        av = np.abs(x[:28])
         
         # High values in certain components indicate fraud
-        for i in [1, 3, 4, 10, 12, 14]:
-            v_key = f'V{i}'
-            v_value = transaction_data.get(v_key, 0)
-            if abs(v_value) > 2.5:  # Lowered threshold from 3.0
-                suspicious_count += 1
-                fraud_score += 0.12  # Increased from 0.08
+        suspicious_count = int((av[self._HIGH_IDX] > 2.5).sum())
+        fraud_score += 0.12 * suspicious_count
         
         # 3. Check for extreme outliers in any V component
-        extreme_outliers = 0
-        for i in range(1, 29):
-            v_key = f'V{i}'
-            v_value = transaction_data.get(v_key, 0)
-            if abs(v_value) > 3.5:  # Lowered from 4.0
-                extreme_outliers += 1
-                fraud_score += 0.15  # Increased from 0.12
+        extreme_outliers = int((av > 3.5).sum())
+        fraud_score += 0.15 * extreme_outliers
         
         # 4. Multiple anomalies together increase risk significantly
         if suspicious_count >= 3:
@@ -92,7 +93,7 @@ class DemoFraudPredictor:
             fraud_score += 0.08  # New tier
         
         # 5. Time-based patterns (unusual times can be suspicious)
-        time_val = transaction_data.get('Time', 0)
+        time_val = float(x[29])
         # Normalize time to hours (assuming seconds)
         hour = (time_val / 3600) % 24
         # Late night/early morning transactions (12 AM - 6 AM)
@@ -106,7 +107,7 @@ class DemoFraudPredictor:
             fraud_score += 0.10  # New combination
         
         # 7. Add controlled randomness for variety (±8%)
-        noise = np.random.uniform(-0.08, 0.08)  # Increased from ±5%
+        noise = self._rng.uniform(-0.08, 0.08)  # Increased from ±5%
         fraud_score = max(0.0, min(1.0, fraud_score + noise))
         
         # Calculate final probability with sigmoid-like scaling
@@ -126,6 +127,28 @@ class DemoFraudPredictor:
         
         return result
     
+    def _to_feature_array(self, transaction_data):
+        """
+        Coerce a transaction into a length-30 array
+        
+        Args:
+            transaction_data (dict or array): Transaction features; arrays are
+                expected in order V1-V28, Amount, Time (as FraudPredictor.predict_single_array)
+            
+        Returns:
+            np.ndarray: Features in order V1-V28, Amount, Time (missing dict keys are 0)
+            
+        Raises:
+            ValueError: If an array doesn't hold exactly 30 features
+        """
+        if isinstance(transaction_data, dict):
+            return np.fromiter((transaction_data.get(k, 0.0) for k in self._FEATURE_KEYS), dtype=np.float64, count=30)
+        
+        values = np.asarray(transaction_data, dtype=np.float64).ravel()
+        if values.shape[0] != 30:
+            raise ValueError(f"Expected 30 features, got {values.shape[0]}")
+        return values
+    
     def predict_batch(self, transactions_df, threshold=0.5):
         """
         Predict fraud for multiple transactions
@@ -137,17 +160,47 @@ class DemoFraudPredictor:
         Returns:
             pd.DataFrame: DataFrame with predictions
         """
-        import pandas as pd
+        n = len(transactions_df)
+        zeros = np.zeros(n)
+        
+        # Pull the whole feature matrix out once (missing columns count as 0)
+        V = transactions_df.reindex(columns=list(self._ALL_V_KEYS), fill_value=0).to_numpy(dtype=np.float32)
+        amount = transactions_df['Amount'].to_numpy(dtype=np.float64) if 'Amount' in transactions_df else zeros
+        time_val = transactions_df['Time'].to_numpy(dtype=np.float64) if 'Time' in transactions_df else zeros
         
-        results = []
-        for _, row in transactions_df.iterrows():
-            result = self.predict_single(row.to_dict(), threshold)
-            results.append(result)
+        # Same rules as predict_single, evaluated for every row at once
+        fraud_score = np.select(
+            [amount > self.high_amount_threshold, amount > 500, amount > 200, amount < 1],
+            [0.25, 0.15, 0.08, 0.10],
+            default=0.0
+        )
+        
+        av = np.abs(V)
+        suspicious_count = (av[:, self._HIGH_IDX] > 2.5).sum(axis=1)
+        extreme_outliers = (av > 3.5).sum(axis=1)
+        fraud_score += 0.12 * suspicious_count + 0.15 * extreme_outliers
+        
+        fraud_score += np.where(suspicious_count >= 3, 0.20, 0.0)
+        fraud_score += np.where(suspicious_count >= 2, 0.10, 0.0)
+        fraud_score += np.where(extreme_outliers >= 2, 0.25, 0.0)
+        fraud_score += np.where(extreme_outliers >= 1, 0.08, 0.0)
+        
+        hour = (time_val / 3600) % 24
+        fraud_score += np.where((hour >= 0) & (hour < 6), 0.08, 0.0)
+        
+        fraud_score += np.where((amount > 500) & (suspicious_count >= 2), 0.20, 0.0)
+        fraud_score += np.where((amount > 300) & (suspicious_count >= 1), 0.10, 0.0)
+        
+        noise = self._rng.uniform(-0.08, 0.08, size=n)
+        fraud_score = np.clip(fraud_score + noise, 0.0, 1.0)
+        
+        probabilities = self._smooth_score_vec(fraud_score)
+        risk_levels = self._LEVEL_NAMES[np.searchsorted(self._LEVEL_BOUNDS, probabilities, side='right')]
         
         results_df = transactions_df.copy()
-        results_df['fraud_probability'] = [r['fraud_probability'] for r in results]
-        results_df['is_fraud'] = [r['is_fraud'] for r in results]
-        results_df['risk_level'] = [r['risk_level'] for r in results]
+        results_df['fraud_probability'] = probabilities
+        results_df['is_fraud'] = probabilities > threshold
+        results_df['risk_level'] = risk_levels
         
         return results_df
     
@@ -163,9 +216,20 @@ class DemoFraudPredictor:
         """
         # Use a modified sigmoid to spread scores more naturally
         # This prevents clustering at extremes
-        x = (raw_score - 0.5) * 6  # Scale and center
-        smoothed = 1 / (1 + np.exp(-x))
-        return smoothed
+        x = (raw_score - 0.5) * 6.0  # Scale and center
+        return 1.0 / (1.0 + math.exp(-x))
+    
+    def _smooth_score_vec(self, raw_scores):
+        """
+        Vectorized version of _smooth_score for batch predictions
+        
+        Args:
+            raw_scores (np.ndarray): Raw fraud scores (0-1)
+            
+        Returns:
+            np.ndarray: Smoothed probabilities
+        """
+        return 1.0 / (1.0 + np.exp(-(raw_scores - 0.5) * 6.0))
     
     def _get_risk_level(self, probability):
         """
@@ -3,13 +3,12 @@ Model Evaluation Script
 Provides detailed performance metrics and visualizations
 """
 
+import argparse
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # File output only; skip GUI backend setup
 import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import (
-    confusion_matrix, classification_report, roc_curve, auc,
-    precision_recall_curve, f1_score
-)
+from sklearn.metrics import confusion_matrix, auc
 import sys
 import os
 
@@ -18,62 +17,181 @@ from config import Config
 from src.data_preprocessing import DataPreprocessor
 from src.model import FraudDetectionModel
 
+# One figure reused by every plot helper instead of allocating a new one per plot
+# (created on the first plot: plots are opt-in, so most runs never need it)
+_FIG, _AX = None, None
 
-def plot_confusion_matrix(y_true, y_pred, save_path):
-    """Plot confusion matrix"""
-    cm = confusion_matrix(y_true, y_pred)
+
+def _get_axes():
+    """
+    Get the shared figure and axes, cleared of the last plot
+    
+    Returns:
+        tuple: (Figure, Axes)
+    """
+    global _FIG, _AX
+    if _FIG is None:
+        _FIG, _AX = plt.subplots(figsize=(8, 6))
     
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', cbar=True)
-    plt.title('Confusion Matrix')
-    plt.ylabel('True Label')
-    plt.xlabel('Predicted Label')
-    plt.tight_layout()
-    plt.savefig(save_path)
+    # Drop extra axes (e.g. colorbars) left by the previous plot
+    for ax in _FIG.axes:
+        if ax is not _AX:
+            ax.remove()
+    _AX.clear()
+    return _FIG, _AX
+
+
+def _save_figure(fig, save_path):
+    """Lay out and write the shared figure"""
+    fig.tight_layout()
+    fig.savefig(save_path)
+
+
+def _safe_div(numerator, denominator):
+    """Division that returns 0.0 when the denominator is 0 (sklearn's zero_division=0)"""
+    return numerator / denominator if denominator else 0.0
+
+
+def metrics_from_confusion_matrix(cm):
+    """
+    Derive per-class and fraud-class metrics from a 2x2 confusion matrix
+    
+    Args:
+        cm (np.ndarray): Confusion matrix [[TN, FP], [FN, TP]]
+        
+    Returns:
+        dict: precision/recall/f1/support per class, plus accuracy and counts
+    """
+    tn, fp, fn, tp = (int(v) for v in cm.ravel())
+    
+    metrics = {'tn': tn, 'fp': fp, 'fn': fn, 'tp': tp}
+    for name, (hit, false_pos, false_neg) in (('Normal', (tn, fn, fp)), ('Fraud', (tp, fp, fn))):
+        precision = _safe_div(hit, hit + false_pos)
+        recall = _safe_div(hit, hit + false_neg)
+        metrics[name] = {
+            'precision': precision,
+            'recall': recall,
+            'f1': _safe_div(2 * precision * recall, precision + recall),
+            'support': hit + false_neg
+        }
+    metrics['accuracy'] = _safe_div(tp + tn, tn + fp + fn + tp)
+    
+    return metrics
+
+
+def format_classification_report(metrics):
+    """Format metrics_from_confusion_matrix output exactly like sklearn's classification_report"""
+    head_fmt = "{:>12s} " + " {:>9}" * 4
+    row_fmt = "{:>12s} " + " {:>9.2f}" * 3 + " {:>9}"
+    classes = [metrics[name] for name in ('Normal', 'Fraud')]
+    total = sum(m['support'] for m in classes)
+    
+    lines = [head_fmt.format('', 'precision', 'recall', 'f1-score', 'support'), ""]
+    for name, m in zip(('Normal', 'Fraud'), classes):
+        lines.append(row_fmt.format(name, m['precision'], m['recall'], m['f1'], m['support']))
+    lines.append("")
+    lines.append(("{:>12s} " + " {:>9}" * 2 + " {:>9.2f} {:>9}").format('accuracy', '', '', metrics['accuracy'], total))
+    
+    # Unweighted mean over classes, and mean weighted by class support
+    for avg_name, weights in (('macro avg', (1, 1)), ('weighted avg', [m['support'] for m in classes])):
+        norm = _safe_div(1.0, sum(weights))
+        averaged = [sum(w * m[key] for w, m in zip(weights, classes)) * norm for key in ('precision', 'recall', 'f1')]
+        lines.append(row_fmt.format(avg_name, *averaged, total))
+    return "\n".join(lines) + "\n"
+
+
+def curves_from_scores(y_true, y_proba):
+    """
+    Compute ROC and Precision-Recall curves from a single sort of the scores
+    
+    Args:
+        y_true: Binary labels
+        y_proba: Predicted fraud probabilities
+        
+    Returns:
+        dict: fpr, tpr, precision, recall arrays and roc_auc
+    """
+    y_true = np.asarray(y_true).ravel()
+    y_proba = np.asarray(y_proba).ravel()
+    
+    # Sort once by descending score; one cumulative pass gives TP/FP counts
+    order = np.argsort(-y_proba, kind='mergesort')
+    y_sorted = y_true[order]
+    scores_sorted = y_proba[order]
+    
+    # Only evaluate at distinct thresholds (ties move together)
+    threshold_idx = np.r_[np.flatnonzero(np.diff(scores_sorted)), y_sorted.shape[0] - 1]
+    tps = np.cumsum(y_sorted)[threshold_idx]
+    fps = 1 + threshold_idx - tps
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tpr = np.r_[0, tps / tps[-1]]
+        fpr = np.r_[0, fps / fps[-1]]
+        precision = np.r_[1, tps / (tps + fps)]
+        recall = tpr
+    
+    return {
+        'fpr': fpr,
+        'tpr': tpr,
+        'precision': precision,
+        'recall': recall,
+        'roc_auc': auc(fpr, tpr)
+    }
+
+
+def plot_confusion_matrix(cm, save_path):
+    """Plot a precomputed confusion matrix"""
+    fig, ax = _get_axes()
+    image = ax.imshow(cm, cmap='Blues', aspect='auto')
+    text_threshold = cm.max() / 2.0
+    for (i, j), value in np.ndenumerate(cm):
+        ax.text(j, i, str(value), ha='center', va='center',
+                color='white' if value > text_threshold else 'black')
+    fig.colorbar(image, ax=ax)
+    ax.set_xticks(range(cm.shape[1]))
+    ax.set_yticks(range(cm.shape[0]))
+    ax.set_title('Confusion Matrix')
+    ax.set_ylabel('True Label')
+    ax.set_xlabel('Predicted Label')
+    _save_figure(fig, save_path)
     print(f"Confusion matrix saved to {save_path}")
-    plt.close()
-
-
-def plot_roc_curve(y_true, y_proba, save_path):
-    """Plot ROC curve"""
-    fpr, tpr, _ = roc_curve(y_true, y_proba)
-    roc_auc = auc(fpr, tpr)
-    
-    plt.figure(figsize=(8, 6))
-    plt.plot(fpr, tpr, color='darkorange', lw=2, label=f'ROC curve (AUC = {roc_auc:.2f})')
-    plt.plot([0, 1], [0, 1], color='navy', lw=2, linestyle='--', label='Random Classifier')
-    plt.xlim([0.0, 1.0])
-    plt.ylim([0.0, 1.05])
-    plt.xlabel('False Positive Rate')
-    plt.ylabel('True Positive Rate')
-    plt.title('Receiver Operating Characteristic (ROC) Curve')
-    plt.legend(loc="lower right")
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(save_path)
+
+
+def plot_roc_curve(fpr, tpr, roc_auc, save_path):
+    """Plot a precomputed ROC curve"""
+    fig, ax = _get_axes()
+    ax.plot(fpr, tpr, color='darkorange', lw=2, label=f'ROC curve (AUC = {roc_auc:.2f})')
+    ax.plot([0, 1], [0, 1], color='navy', lw=2, linestyle='--', label='Random Classifier')
+    ax.set_xlim([0.0, 1.0])
+    ax.set_ylim([0.0, 1.05])
+    ax.set_xlabel('False Positive Rate')
+    ax.set_ylabel('True Positive Rate')
+    ax.set_title('Receiver Operating Characteristic (ROC) Curve')
+    ax.legend(loc="lower right")
+    ax.grid(True, alpha=0.3)
+    _save_figure(fig, save_path)
     print(f"ROC curve saved to {save_path}")
-    plt.close()
 
 
-def plot_precision_recall_curve(y_true, y_proba, save_path):
-    """Plot Precision-Recall curve"""
-    precision, recall, _ = precision_recall_curve(y_true, y_proba)
-    
-    plt.figure(figsize=(8, 6))
-    plt.plot(recall, precision, color='blue', lw=2)
-    plt.xlabel('Recall')
-    plt.ylabel('Precision')
-    plt.title('Precision-Recall Curve')
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(save_path)
+def plot_precision_recall_curve(precision, recall, save_path):
+    """Plot a precomputed Precision-Recall curve"""
+    fig, ax = _get_axes()
+    ax.plot(recall, precision, color='blue', lw=2)
+    ax.set_xlabel('Recall')
+    ax.set_ylabel('Precision')
+    ax.set_title('Precision-Recall Curve')
+    ax.grid(True, alpha=0.3)
+    _save_figure(fig, save_path)
     print(f"Precision-Recall curve saved to {save_path}")
-    plt.close()
 
 
-def evaluate_model():
+def evaluate_model(plots=False):
     """
     Complete model evaluation pipeline
+    
+    Args:
+        plots (bool): Also render the confusion matrix, ROC and PR curve PNGs.
+            The raw arrays are always saved to visualizations/metrics.npz.
     """
     print("="*70)
     print(" CREDIT CARD FRAUD DETECTION - MODEL EVALUATION")
@@ -101,8 +219,9 @@ def evaluate_model():
     fraud_model = FraudDetectionModel()
     fraud_model.load_model()
     
-    # Make predictions
+    # Make predictions (float32 end-to-end, matching the model's input dtype)
     print("\nMaking predictions on test set...")
+    X_test = X_test.astype(np.float32, copy=False)
     y_proba, y_pred = fraud_model.predict(X_test, threshold=0.5)
     
     # Evaluation metrics
@@ -110,44 +229,66 @@ def evaluate_model():
     print("EVALUATION METRICS")
     print("="*70)
     
+    # Confusion Matrix (computed once; every other label metric is derived from it)
+    cm = confusion_matrix(y_test, y_pred, labels=[0, 1])
+    metrics = metrics_from_confusion_matrix(cm)
+    
     print("\nClassification Report:")
-    print(classification_report(y_test, y_pred, target_names=['Normal', 'Fraud']))
+    print(format_classification_report(metrics))
     
-    # Confusion Matrix
-    cm = confusion_matrix(y_test, y_pred)
     print("\nConfusion Matrix:")
     print(cm)
-    print(f"\nTrue Negatives: {cm[0][0]}")
-    print(f"False Positives: {cm[0][1]}")
-    print(f"False Negatives: {cm[1][0]}")
-    print(f"True Positives: {cm[1][1]}")
+    print(f"\nTrue Negatives: {metrics['tn']}")
+    print(f"False Positives: {metrics['fp']}")
+    print(f"False Negatives: {metrics['fn']}")
+    print(f"True Positives: {metrics['tp']}")
     
     # Additional metrics
-    f1 = f1_score(y_test, y_pred)
+    f1 = metrics['Fraud']['f1']
     print(f"\nF1-Score: {f1:.4f}")
     
     # ROC-AUC
-    fpr, tpr, _ = roc_curve(y_test, y_proba)
-    roc_auc = auc(fpr, tpr)
+    curves = curves_from_scores(y_test, y_proba)
+    roc_auc = curves['roc_auc']
     print(f"ROC-AUC Score: {roc_auc:.4f}")
     
-    # Create visualizations
-    print("\n" + "="*70)
-    print("GENERATING VISUALIZATIONS")
-    print("="*70)
-    
+    # Save raw arrays so plots can be rendered later without re-running inference
     vis_dir = os.path.join(config.MODEL_DIR, 'visualizations')
     os.makedirs(vis_dir, exist_ok=True)
     
-    plot_confusion_matrix(y_test, y_pred, os.path.join(vis_dir, 'confusion_matrix.png'))
-    plot_roc_curve(y_test, y_proba, os.path.join(vis_dir, 'roc_curve.png'))
-    plot_precision_recall_curve(y_test, y_proba, os.path.join(vis_dir, 'precision_recall_curve.png'))
+    metrics_path = os.path.join(vis_dir, 'metrics.npz')
+    np.savez_compressed(
+        metrics_path,
+        cm=cm,
+        fpr=curves['fpr'],
+        tpr=curves['tpr'],
+        precision=curves['precision'],
+        recall=curves['recall'],
+        y_proba=np.asarray(y_proba, dtype=np.float32).ravel()
+    )
+    print(f"\nMetrics arrays saved to {metrics_path}")
+    
+    # Create visualizations (opt-in)
+    if plots:
+        print("\n" + "="*70)
+        print("GENERATING VISUALIZATIONS")
+        print("="*70)
+        
+        plot_confusion_matrix(cm, os.path.join(vis_dir, 'confusion_matrix.png'))
+        plot_roc_curve(curves['fpr'], curves['tpr'], roc_auc, os.path.join(vis_dir, 'roc_curve.png'))
+        plot_precision_recall_curve(curves['precision'], curves['recall'], os.path.join(vis_dir, 'precision_recall_curve.png'))
     
     print("\n" + "="*70)
     print("EVALUATION COMPLETED!")
     print("="*70)
-    print(f"\nVisualization saved in: {vis_dir}")
-
+    print(f"\nResults saved in: {vis_dir}")
+    if not plots:
+        print("Run with --plots to also generate the PNG visualizations")
 
 if __name__ == "__main__":
-    evaluate_model()
+    parser = argparse.ArgumentParser(description="Evaluate the trained fraud detection model")
+    parser.add_argument('--plots', action=argparse.BooleanOptionalAction, default=False,
+                        help="Generate confusion matrix, ROC and PR curve PNGs")
+    args = parser.parse_args()
+    
+    evaluate_model(plots=args.plots)
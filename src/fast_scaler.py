@@ -0,0 +1,35 @@
+"""
+Fast StandardScaler application for single-transaction predictions
+Uses a Numba kernel when numba is installed, NumPy otherwise
+"""
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _apply_scaler_numpy(x, mean, inv_scale, out):
+    """NumPy fallback: out = (x - mean) * inv_scale"""
+    np.subtract(x, mean, out=out)
+    np.multiply(out, inv_scale, out=out)
+
+
+if numba is not None:
+    @numba.njit(cache=True, fastmath=True, boundscheck=False)
+    def apply_scaler(x, mean, inv_scale, out):
+        """
+        Standardize a feature vector in one fused pass
+        
+        Args:
+            x (np.ndarray): Raw features (1-D)
+            mean (np.ndarray): Scaler mean_
+            inv_scale (np.ndarray): 1 / scaler.scale_
+            out (np.ndarray): Output buffer, same shape as x
+        """
+        for i in range(x.shape[0]):
+            out[i] = (x[i] - mean[i]) * inv_scale[i]
+else:
+    apply_scaler = _apply_scaler_numpy
@@ -3,13 +3,45 @@ Neural Network Model Architecture for Fraud Detection
 Implements MLP with regularization techniques
 """
 
-import tensorflow as tf
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
 
+# OpenMP settings must be in place before TensorFlow is imported
+os.environ.setdefault('OMP_NUM_THREADS', str(Config.INTRA_THREADS))
+os.environ.setdefault('KMP_AFFINITY', 'granularity=fine,compact')
+
+import numpy as np
+import threading
+import tensorflow as tf
+
+try:
+    tf.config.threading.set_intra_op_parallelism_threads(Config.INTRA_THREADS)
+    tf.config.threading.set_inter_op_parallelism_threads(Config.INTER_THREADS)
+except RuntimeError:
+    # TensorFlow was already initialized elsewhere in this process
+    pass
+
+
+def _sigmoid(logits):
+    """Logistic function (matches the output layer's sigmoid activation)"""
+    return 1.0 / (1.0 + np.exp(-logits))
+
+
+def _logit(probability):
+    """Inverse of _sigmoid; 0 and 1 map to -inf and +inf"""
+    with np.errstate(divide='ignore'):
+        return np.log(probability) - np.log1p(-probability)
+
+
+def _above(values, cutoff):
+    """0/1 labels for values > cutoff, written straight into a uint8 array"""
+    labels = np.empty(np.shape(values), dtype=np.uint8)
+    np.greater(values, cutoff, out=labels)
+    return labels
+
 
 class FraudDetectionModel:
     """
@@ -20,6 +52,7 @@ class FraudDetectionModel:
         self.config = Config()
         self.model = None
         self.history = None
+        self._infer = None
         
     def build_model(self):
         """
@@ -139,8 +172,8 @@ class FraudDetectionModel:
         
         # Calculate class weights for imbalanced data
         total = len(y_train)
-        neg_count = (y_train == 0).sum()
-        pos_count = (y_train == 1).sum()
+        counts = np.bincount(np.asarray(y_train).ravel().astype(np.intp), minlength=2)
+        neg_count, pos_count = counts[0], counts[1]
         
         weight_for_0 = (1 / neg_count) * (total / 2.0)
         weight_for_1 = (1 / pos_count) * (total / 2.0)
@@ -194,10 +227,73 @@ class FraudDetectionModel:
         
         print(f"Loading model from {model_path}...")
         self.model = tf.keras.models.load_model(model_path)
+        self._build_inference_fn()
         print("Model loaded successfully!")
         
         return self.model
     
+    def _build_inference_fn(self):
+        """
+        Trace the forward pass once into a concrete function so inference
+        skips Keras predict() batching, callbacks and progress bar overhead.
+        
+        The traced function stops before the output sigmoid and returns logits:
+        labels only need a comparison against logit(threshold), so the sigmoid
+        is applied only when probabilities are actually requested.
+        """
+        hidden_layers = self.model.layers[:-1]
+        output_layer = self.model.layers[-1]
+        
+        def logits_fn(x):
+            for layer in hidden_layers:
+                x = layer(x, training=False)
+            return tf.matmul(x, output_layer.kernel) + output_layer.bias
+        
+        self._infer = tf.function(logits_fn).get_concrete_function(
+            tf.TensorSpec([None, self.config.INPUT_DIM], tf.float32)
+        )
+    
+    def predict_logits(self, X):
+        """
+        Compute raw output logits (requires a loaded model)
+        
+        Args:
+            X: Input features (already scaled)
+            
+        Returns:
+            np.ndarray: Logits, shape (n, 1)
+        """
+        return self._infer(tf.convert_to_tensor(X, dtype=tf.float32)).numpy()
+    
+    def predict_proba(self, X):
+        """
+        Compute fraud probabilities
+        
+        Args:
+            X: Input features (already scaled)
+            
+        Returns:
+            np.ndarray: Probabilities, shape (n, 1)
+        """
+        if self._infer is None:
+            return self.model.predict(X)
+        return _sigmoid(self.predict_logits(X))
+    
+    def predict_labels(self, X, threshold=0.5):
+        """
+        Predict class labels without computing probabilities
+        
+        Args:
+            X: Input features (already scaled)
+            threshold (float): Classification threshold
+            
+        Returns:
+            np.ndarray: Predictions (0/1), shape (n, 1), dtype uint8
+        """
+        if self._infer is None:
+            return _above(self.model.predict(X), threshold)
+        return _above(self.predict_logits(X), _logit(threshold))
+    
     def predict(self, X, threshold=0.5):
         """
         Make predictions
@@ -209,12 +305,107 @@ class FraudDetectionModel:
         Returns:
             tuple: (probabilities, predictions)
         """
-        probabilities = self.model.predict(X)
-        predictions = (probabilities > threshold).astype(int)
+        if self._infer is None:
+            probabilities = self.model.predict(X)
+            predictions = _above(probabilities, threshold)
+            return probabilities, predictions
+        
+        logits = self.predict_logits(X)
+        predictions = _above(logits, _logit(threshold))
+        probabilities = _sigmoid(logits)
         
         return probabilities, predictions
 
 
+class TFLiteFraudModel:
+    """
+    INT8-quantized version of the fraud model (see src/quantize.py),
+    served through a cached TFLite interpreter
+    """
+    
+    def __init__(self):
+        self.config = Config()
+        self.interpreter = None
+        self._input_index = None
+        self._output_index = None
+        self._batch_rows = None
+        self._lock = threading.Lock()  # Interpreter is not thread-safe
+    
+    def load_model(self, model_path=None):
+        """
+        Load a quantized .tflite model
+        
+        Args:
+            model_path (str): Path to the .tflite file
+            
+        Returns:
+            tf.lite.Interpreter: Ready-to-run interpreter
+        """
+        if model_path is None:
+            model_path = self.config.TFLITE_PATH
+        
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"TFLite model not found at {model_path}")
+        
+        print(f"Loading quantized model from {model_path}...")
+        self.interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=self.config.INTRA_THREADS)
+        self._input_index = self.interpreter.get_input_details()[0]['index']
+        self._output_index = self.interpreter.get_output_details()[0]['index']
+        print("Model loaded successfully!")
+        
+        return self.interpreter
+    
+    def predict_proba(self, X):
+        """
+        Compute fraud probabilities
+        
+        Args:
+            X: Input features (already scaled)
+            
+        Returns:
+            np.ndarray: Probabilities, shape (n, 1)
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        with self._lock:
+            # Only re-plan the interpreter when the batch size changes
+            if X.shape[0] != self._batch_rows:
+                self.interpreter.resize_tensor_input(self._input_index, X.shape)
+                self.interpreter.allocate_tensors()
+                self._batch_rows = X.shape[0]
+            self.interpreter.set_tensor(self._input_index, X)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output_index).copy()
+    
+    def predict(self, X, threshold=0.5):
+        """
+        Make predictions
+        
+        Args:
+            X: Input features
+            threshold (float): Classification threshold
+            
+        Returns:
+            tuple: (probabilities, predictions)
+        """
+        probabilities = self.predict_proba(X)
+        predictions = _above(probabilities, threshold)
+        
+        return probabilities, predictions
+    
+    def predict_labels(self, X, threshold=0.5):
+        """
+        Predict class labels
+        
+        Args:
+            X: Input features (already scaled)
+            threshold (float): Classification threshold
+            
+        Returns:
+            np.ndarray: Predictions (0/1), shape (n, 1), dtype uint8
+        """
+        return _above(self.predict_proba(X), threshold)
+
+
 if __name__ == "__main__":
     # Test model building
     fraud_model = FraudDetectionModel()
@@ -4,15 +4,105 @@ Prediction module for making fraud predictions on new transactions
 
 import numpy as np
 import pandas as pd
+import multiprocessing
+import operator
+import queue
+import threading
+import time
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 from config import Config
 # Lazy import - only import when actually loading model
 # from src.model import FraudDetectionModel
 from src.data_preprocessing import DataPreprocessor
 from src.demo_predictor import DemoFraudPredictor
+from src.fast_scaler import apply_scaler
+from src.fast_risk import risk_codes, RISK_LEVELS
+
+
+class _MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one forward pass.
+    
+    Callers block in submit(); a background worker collects up to batch_size
+    rows (waiting at most timeout_us after the first one), runs the model once
+    and hands each caller its own probability. A caller with no concurrent
+    requests in flight skips the queue and runs the model directly.
+    """
+    
+    def __init__(self, infer_fn, batch_size, timeout_us):
+        self._infer_fn = infer_fn
+        self._batch_size = batch_size
+        self._timeout = timeout_us / 1e6
+        self._start()
+        
+        # Threads don't survive fork(): give each forked child (e.g. a gunicorn
+        # worker forked from a preloaded master) its own queue and worker
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._start)
+    
+    def _start(self):
+        self._queue = queue.Queue()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='fraud-micro-batcher', daemon=True)
+        self._thread.start()
+    
+    def submit(self, row):
+        """
+        Queue one scaled feature row and wait for its probability
+        
+        Args:
+            row (np.ndarray): Scaled features, shape (1, n_features)
+            
+        Returns:
+            float: Fraud probability
+        """
+        with self._pending_lock:
+            self._pending += 1
+            uncontended = self._pending == 1
+        try:
+            # Nothing to coalesce with: don't pay the hand-off and batch timeout
+            if uncontended:
+                return float(self._infer_fn(row)[0, 0])
+            
+            done = threading.Event()
+            slot = {}
+            self._queue.put((row, done, slot))
+            done.wait()
+            if 'error' in slot:
+                raise slot['error']
+            return slot['probability']
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+    
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + self._timeout
+            while len(items) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                probabilities = self._infer_fn(np.vstack([row for row, _, _ in items]))
+                for (_, done, slot), probability in zip(items, probabilities[:, 0]):
+                    slot['probability'] = float(probability)
+                    done.set()
+            except Exception as e:
+                for _, done, slot in items:
+                    slot['error'] = e
+                    done.set()
 
 
 class FraudPredictor:
@@ -23,60 +113,111 @@ class FraudPredictor:
     def __init__(self):
         self.config = Config()
         self.model = None
+        self.fraud_model = None
         self.scaler = None
         self.demo_predictor = None
         self.is_demo_mode = False
+        self._batcher = None
+        self._mean = None
+        self._inv_scale = None
+        self._feature_cols = None
+        
+        # Feature order the scaler/model were trained on (creditcard.csv column order)
+        self._feature_keys = tuple(['Time'] + [f'V{i}' for i in range(1, 29)] + ['Amount'])
+        self._getter = operator.itemgetter(*self._feature_keys)
+        # predict_single_array input (V1-V28, Amount, Time) -> training order
+        self._array_order = np.r_[29, 0:29]
         
     def load_model_and_scaler(self):
         """Load the trained model and scaler, or fallback to demo mode"""
         print("Loading model and scaler...")
         
-        # Always check file existence first
-        model_path = self.config.MODEL_PATH
-        scaler_path = self.config.SCALER_PATH
-        
-        # Use demo mode if model file doesn't exist
-        if not os.path.exists(model_path) or not os.path.exists(scaler_path):
-            print(f"⚠️  Model files not found")
-            print(f"   Model path: {model_path} (exists: {os.path.exists(model_path)})")
-            print(f"   Scaler path: {scaler_path} (exists: {os.path.exists(scaler_path)})")
-            print("🔄 Switching to DEMO MODE with rule-based predictor...")
-            self.demo_predictor = DemoFraudPredictor()
-            self.is_demo_mode = True
-            print("✓ Demo mode activated successfully!")
-            return
-        
-        # Try to load model if files exist
         try:
-            # Load model
-            from src.model import FraudDetectionModel
-            fraud_model = FraudDetectionModel()
-            self.model = fraud_model.load_model()
-            
-            # Load scaler
+            # Load scaler first: a missing file fails fast, before TensorFlow is imported
             preprocessor = DataPreprocessor()
             self.scaler = preprocessor.load_scaler()
             
+            # Load model (prefer the INT8-quantized version if it has been generated)
+            self._load_inference_model()
+            
+            # float32 scaler parameters for the fused batch scaling in predict_batch
+            self._mean = self.scaler.mean_.astype(np.float32)
+            self._inv_scale = self.scaler.inv_scale_.astype(np.float32)
+            feature_names = getattr(self.scaler, 'feature_names_in_', None)
+            self._feature_cols = list(feature_names) if feature_names is not None else None
+            
+            self._warmup()
+            
+            if self.config.MICRO_BATCHING:
+                self._batcher = _MicroBatcher(
+                    self.fraud_model.predict_proba,
+                    self.config.INFERENCE_BATCH_SIZE,
+                    self.config.BATCH_TIMEOUT_US
+                )
+            
             print("✓ Model and scaler loaded successfully!")
             
-        except (FileNotFoundError, OSError, IOError, Exception) as e:
+        except FileNotFoundError as e:
+            print(f"⚠️  Model files not found: {str(e)}")
+            self._use_demo_mode()
+        except Exception as e:
             print(f"⚠️  Error loading model: {str(e)}")
-            print("🔄 Switching to DEMO MODE with rule-based predictor...")
-            self.demo_predictor = DemoFraudPredictor()
-            self.is_demo_mode = True
-            print("✓ Demo mode activated successfully!")
+            self._use_demo_mode()
+    
+    def _load_inference_model(self):
+        """Load the quantized TFLite model, or the Keras model if it is missing or unusable"""
+        from src.model import FraudDetectionModel, TFLiteFraudModel
+        try:
+            self.fraud_model = TFLiteFraudModel()
+            self.model = self.fraud_model.load_model()
+            # A .tflite built for a different input shape loads fine and only fails when run
+            self.fraud_model.predict_proba(np.zeros((1, self.config.INPUT_DIM), dtype=np.float32))
+            return
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️  Could not use quantized model ({e}); loading the Keras model instead")
+        
+        self.fraud_model = FraudDetectionModel()
+        self.model = self.fraud_model.load_model()
+    
+    def _use_demo_mode(self):
+        """Fall back to the rule-based predictor"""
+        print("🔄 Switching to DEMO MODE with rule-based predictor...")
+        self.model = None
+        self.fraud_model = None
+        self.scaler = None
+        self.demo_predictor = DemoFraudPredictor()
+        self.is_demo_mode = True
+        print("✓ Demo mode activated successfully!")
+    
+    def _warmup(self):
+        """
+        Run dummy inputs through the loaded model at the single-row and
+        micro-batch shapes so kernel setup and buffer allocation happen at
+        load time instead of on the first real request
+        """
+        for batch_size in (1, self.config.INFERENCE_BATCH_SIZE):
+            self.fraud_model.predict_proba(
+                np.zeros((batch_size, self.config.INPUT_DIM), dtype=np.float32)
+            )
     
     def predict_single(self, transaction_data, threshold=0.5):
         """
         Predict fraud for a single transaction
         
         Args:
-            transaction_data (dict or array): Transaction features
+            transaction_data (dict or array): Transaction features, keyed by name
+                or as an array in predict_single_array's order (V1-V28, Amount, Time)
             threshold (float): Classification threshold
             
         Returns:
             dict: Prediction results
         """
+        # Arrays mean the same thing in real and demo mode
+        if not isinstance(transaction_data, dict):
+            return self.predict_single_array(np.asarray(transaction_data, dtype=np.float64).ravel(), threshold)
+        
         if self.model is None and self.scaler is None and self.demo_predictor is None:
             self.load_model_and_scaler()
         
@@ -84,41 +225,78 @@ class FraudPredictor:
         if self.is_demo_mode:
             return self.demo_predictor.predict_single(transaction_data, threshold)
         
-        # Convert to numpy array if dict
-        if isinstance(transaction_data, dict):
-            # Ensure correct order of features
-            feature_cols = [f'V{i}' for i in range(1, 29)] + ['Amount', 'Time']
-            transaction_array = np.array([transaction_data.get(col, 0) for col in feature_cols])
-        else:
-            transaction_array = np.array(transaction_data)
+        # Ensure correct order of features (missing features count as 0)
+        try:
+            values = self._getter(transaction_data)
+        except KeyError:
+            values = [transaction_data.get(col, 0) for col in self._feature_keys]
+        transaction_array = np.fromiter(values, dtype=np.float64, count=len(self._feature_keys))
+        
+        return self._predict_array(transaction_array, threshold)
+    
+    def predict_single_array(self, features, threshold=0.5):
+        """
+        Predict fraud for a single transaction already packed into an array
+        
+        Args:
+            features (np.ndarray): 30 features in order V1-V28, Amount, Time.
+                This is the one array order for single predictions: the web
+                app's request order, predict_single's and the demo predictor's.
+            threshold (float): Classification threshold
+            
+        Returns:
+            dict: Prediction results
+        """
+        self._check_feature_count(features)
+        
+        if self.model is None and self.scaler is None and self.demo_predictor is None:
+            self.load_model_and_scaler()
         
-        # Reshape for single prediction
-        transaction_array = transaction_array.reshape(1, -1)
+        if self.is_demo_mode:
+            return self.demo_predictor.predict_single(features, threshold)
+        
+        return self._predict_array(features[self._array_order], threshold)
+    
+    def _check_feature_count(self, features):
+        """The scaling kernel skips bounds checks, so reject wrong-length input up front"""
+        if features.shape[-1] != self.config.INPUT_DIM:
+            raise ValueError(f"Expected {self.config.INPUT_DIM} features, got {features.shape[-1]}")
+    
+    def _predict_array(self, transaction_array, threshold):
+        """Scale and score one feature vector given in training column order"""
+        self._check_feature_count(transaction_array)
         
-        # Scale features
-        transaction_scaled = self.scaler.transform(transaction_array)
+        # Scale features (fused kernel, output shaped for a single prediction)
+        transaction_scaled = np.empty((1, transaction_array.shape[0]), dtype=np.float32)
+        apply_scaler(transaction_array, self.scaler.mean_, self.scaler.inv_scale_, transaction_scaled[0])
         
-        # Make prediction
-        probability = self.model.predict(transaction_scaled)[0][0]
-        prediction = 1 if probability > threshold else 0
+        # Make prediction (converted to a Python float once, here; everything
+        # below stays a native type so responses serialize without coercion)
+        if self._batcher is not None:
+            probability = self._batcher.submit(transaction_scaled)
+        else:
+            probability = float(self.fraud_model.predict_proba(transaction_scaled)[0][0])
         
         result = {
-            'is_fraud': bool(prediction),
-            'fraud_probability': float(probability),
-            'confidence': float(max(probability, 1 - probability)),
+            'is_fraud': probability > threshold,
+            'fraud_probability': probability,
+            'confidence': max(probability, 1.0 - probability),
             'risk_level': self._get_risk_level(probability),
             'demo_mode': False
         }
         
         return result
     
-    def predict_batch(self, transactions_df, threshold=0.5):
+    def predict_batch(self, transactions_df, threshold=0.5, pre_scaled=False):
         """
         Predict fraud for multiple transactions
         
         Args:
             transactions_df (pd.DataFrame): DataFrame with transaction features
             threshold (float): Classification threshold
+            pre_scaled (bool): Features were already transformed by the scaler
+                (e.g. DataPreprocessor output), so skip scaling. Ignored in
+                demo mode, whose rules work on raw feature values.
             
         Returns:
             pd.DataFrame: DataFrame with predictions
@@ -130,21 +308,141 @@ class FraudPredictor:
         if self.is_demo_mode:
             return self.demo_predictor.predict_batch(transactions_df, threshold)
         
-        # Scale features
-        transactions_scaled = self.scaler.transform(transactions_df)
+        features_df = transactions_df[self._feature_cols] if self._feature_cols is not None else transactions_df
+        if pre_scaled:
+            transactions_scaled = features_df.to_numpy(dtype=np.float32)
+        else:
+            # Scale features: (X - mean) * inv_scale, in place on one float32 copy
+            transactions_scaled = features_df.to_numpy(dtype=np.float32, copy=True)
+            np.subtract(transactions_scaled, self._mean, out=transactions_scaled)
+            np.multiply(transactions_scaled, self._inv_scale, out=transactions_scaled)
         
         # Make predictions
-        probabilities = self.model.predict(transactions_scaled)
-        predictions = (probabilities > threshold).astype(int)
+        probabilities = self.fraud_model.predict_proba(transactions_scaled)
+        probs = probabilities.ravel()
+        predictions = np.empty(probs.shape[0], dtype=np.uint8)
+        np.greater(probs, threshold, out=predictions)
+        
+        # Classify all rows at once (same buckets as _get_risk_level)
+        codes = np.empty(probs.shape[0], dtype=np.int8)
+        risk_codes(probs, codes)
+        risk_levels = RISK_LEVELS[codes]
         
         # Create results dataframe
         results_df = transactions_df.copy()
-        results_df['fraud_probability'] = probabilities
+        results_df['fraud_probability'] = probs
         results_df['is_fraud'] = predictions
-        results_df['risk_level'] = results_df['fraud_probability'].apply(self._get_risk_level)
+        results_df['risk_level'] = risk_levels
         
         return results_df
     
+    def predict_batch_parallel(self, transactions_df, num_workers=None, threshold=0.5):
+        """
+        Predict fraud for a large DataFrame using several worker processes
+        
+        Each worker is pinned to its own disjoint set of CPU cores (where the OS
+        supports it), sizes its thread pools to those cores and loads its own
+        copy of the model, so scoring scales past a single TF session's
+        intra-op limits.
+        
+        Args:
+            transactions_df (pd.DataFrame): DataFrame with transaction features
+            num_workers (int): Number of processes (default: one per 4 cores)
+            threshold (float): Classification threshold
+            
+        Returns:
+            pd.DataFrame: DataFrame with predictions (original row order)
+        """
+        if self.model is None and self.scaler is None and self.demo_predictor is None:
+            self.load_model_and_scaler()
+        
+        cores = _available_cores()
+        if num_workers is None:
+            num_workers = max(1, len(cores) // self.config.INTRA_THREADS)
+        num_workers = max(1, min(num_workers, len(cores), len(transactions_df)))
+        
+        # Nothing to gain from extra processes in demo mode or with one worker
+        if self.is_demo_mode or num_workers == 1:
+            return self.predict_batch(transactions_df, threshold)
+        
+        # Rows all cost the same, so equal-sized contiguous chunks balance the load
+        bounds = np.linspace(0, len(transactions_df), num_workers + 1).astype(int)
+        chunks = [transactions_df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+        
+        # Spawned (not forked) so no TensorFlow state is shared with the parent
+        ctx = multiprocessing.get_context('spawn')
+        core_sets = ctx.Queue()
+        for core_set in np.array_split(np.array(cores), num_workers):
+            core_sets.put([int(c) for c in core_set])
+        
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=ctx,
+            initializer=_init_batch_worker,
+            initargs=(core_sets,)
+        ) as executor:
+            results = list(executor.map(_predict_chunk, chunks, repeat(threshold)))
+        
+        return pd.concat(results)
+    
+    def predict_stream(self, path_in, path_out, chunksize=8192, threshold=0.5):
+        """
+        Score a transactions CSV chunk by chunk without loading it into memory
+        
+        The next chunk is parsed on a background thread while the current one
+        is being scored. Output is Parquet when path_out ends in '.parquet'
+        (requires pyarrow), otherwise CSV.
+        
+        Args:
+            path_in (str): Input CSV with transaction features
+            path_out (str): Output file for the scored rows
+            chunksize (int): Rows per chunk
+            threshold (float): Classification threshold
+        
+        Returns:
+            int: Number of rows scored
+        """
+        if self.model is None and self.scaler is None and self.demo_predictor is None:
+            self.load_model_and_scaler()
+        
+        as_parquet = path_out.endswith('.parquet')
+        if as_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        
+        reader = pd.read_csv(
+            path_in,
+            chunksize=chunksize,
+            dtype={key: np.float32 for key in self._feature_keys}
+        )
+        writer = None
+        total_rows = 0
+        
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            next_chunk = prefetcher.submit(next, reader, None)
+            while True:
+                chunk = next_chunk.result()
+                if chunk is None:
+                    break
+                next_chunk = prefetcher.submit(next, reader, None)
+                
+                results_df = self.predict_batch(chunk, threshold)
+                if as_parquet:
+                    table = pa.Table.from_pandas(results_df, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(path_out, table.schema)
+                    writer.write_table(table)
+                else:
+                    results_df.to_csv(path_out, mode='w' if total_rows == 0 else 'a',
+                                      header=total_rows == 0, index=False)
+                total_rows += len(results_df)
+        
+        if writer is not None:
+            writer.close()
+        reader.close()
+        
+        return total_rows
+    
     def _get_risk_level(self, probability):
         """
         Determine risk level based on probability
@@ -165,6 +463,62 @@ class FraudPredictor:
             return 'Critical'
 
 
+def _available_cores():
+    """CPU cores this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+# Per-process predictor for predict_batch_parallel workers
+_worker_predictor = None
+
+
+def _init_batch_worker(core_sets):
+    """
+    ProcessPoolExecutor initializer: pin to a core set, size the thread
+    pools to it (before TensorFlow is imported) and load the model
+    """
+    global _worker_predictor
+    cores = core_sets.get()
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+    os.environ['OMP_NUM_THREADS'] = str(len(cores))
+    Config.INTRA_THREADS = len(cores)
+    Config.INTER_THREADS = 1
+    Config.MICRO_BATCHING = False
+    
+    _worker_predictor = FraudPredictor()
+    _worker_predictor.load_model_and_scaler()
+
+
+def _predict_chunk(chunk_df, threshold):
+    """Score one chunk inside a predict_batch_parallel worker"""
+    return _worker_predictor.predict_batch(chunk_df, threshold)
+
+
+# Process-wide predictor (model, scaler and traced function are loaded once)
+_predictor = None
+_predictor_lock = threading.Lock()
+
+
+def get_predictor():
+    """
+    Get the shared FraudPredictor, loading the model on first use
+    
+    Returns:
+        FraudPredictor: Loaded predictor (falls back to demo mode internally)
+    """
+    global _predictor
+    if _predictor is None:
+        with _predictor_lock:
+            if _predictor is None:
+                predictor = FraudPredictor()
+                predictor.load_model_and_scaler()
+                _predictor = predictor
+    return _predictor
+
+
 if __name__ == "__main__":
     # Example usage
     predictor = FraudPredictor()
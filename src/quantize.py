@@ -0,0 +1,89 @@
+"""
+Post-training INT8 quantization of the fraud detection model
+Converts the trained Keras model to a TFLite model used for inference
+"""
+
+import numpy as np
+import tensorflow as tf
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from src.data_preprocessing import DataPreprocessor
+from src.model import FraudDetectionModel
+
+
+def quantize_model(num_calibration_samples=200):
+    """
+    Quantize the trained model to INT8 and save it as .tflite
+    
+    Args:
+        num_calibration_samples (int): Undersampled dataset rows used to calibrate activation ranges
+        
+    Returns:
+        str: Path to the saved .tflite model, or None on failure
+    """
+    print("="*70)
+    print(" CREDIT CARD FRAUD DETECTION - MODEL QUANTIZATION")
+    print("="*70)
+    
+    config = Config()
+    
+    # Check if model exists
+    if not os.path.exists(config.MODEL_SAVE_PATH):
+        print("\nERROR: Trained model not found!")
+        print(f"Please train the model first using: python src/train.py")
+        return None
+    
+    # Calibration data, scaled with the saved scaler (prepare_data() would refit
+    # and overwrite the scaler the server uses)
+    print("\nLoading calibration data...")
+    preprocessor = DataPreprocessor()
+    try:
+        scaler = preprocessor.load_scaler()
+    except FileNotFoundError as e:
+        print(f"\nERROR: {e}")
+        return None
+    
+    df = preprocessor.load_data(majority_per_fraud=config.UNDERSAMPLE_RATIO * config.MAJORITY_SAMPLE_MARGIN)
+    if df is None:
+        print("\nERROR: Data loading failed!")
+        return None
+    
+    # Same class mix the model was trained on
+    df = preprocessor.handle_imbalance(df, method='undersample')
+    features = df.drop('Class', axis=1).iloc[:num_calibration_samples]
+    calibration = scaler.transform(features).astype(np.float32)
+    
+    def representative_dataset():
+        for row in calibration:
+            yield [row.reshape(1, -1)]
+    
+    # Load model
+    print("\nLoading trained model...")
+    fraud_model = FraudDetectionModel()
+    fraud_model.load_model()
+    
+    # Convert (inputs/outputs stay float32, weights and activations become int8)
+    print("\nQuantizing model to INT8...")
+    converter = tf.lite.TFLiteConverter.from_keras_model(fraud_model.model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    tflite_model = converter.convert()
+    
+    with open(config.TFLITE_SAVE_PATH, 'wb') as f:
+        f.write(tflite_model)
+    
+    print("\n" + "="*70)
+    print("QUANTIZATION COMPLETED!")
+    print("="*70)
+    print(f"\nQuantized model saved to: {config.TFLITE_SAVE_PATH}")
+    print(f"Size: {len(tflite_model) / 1024:.1f} KB")
+    
+    return config.TFLITE_SAVE_PATH
+
+
+if __name__ == "__main__":
+    quantize_model()
@@ -3,8 +3,9 @@ Training script for Credit Card Fraud Detection Model
 """
 
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # File output only; skip GUI backend setup
 import matplotlib.pyplot as plt
-import seaborn as sns
 import joblib
 import sys
 import os
@@ -134,6 +135,7 @@ def main():
     print("\nYou can now:")
     print("1. Run evaluation: python src/evaluate.py")
     print("2. Start web app: python web/app.py")
+    print("3. (Optional) Quantize for faster inference: python src/quantize.py")
     print("="*70)
 
 
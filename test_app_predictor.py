@@ -14,5 +14,6 @@ test['Time'] = 3600
 
 r = p.predict_single(test)
 print(f"Prediction works: {r['is_fraud']}")
+assert all(type(v) in (int, float, bool, str) for v in r.values()), {k: type(v) for k, v in r.items()}
 print(f"Full result: {r}")
 print("\n✅ SUCCESS - Predictor works!")
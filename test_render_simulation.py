@@ -1,139 +0,0 @@
-"""
-Simulate Render environment - test app startup without model files
-"""
-import sys
-import os
-
-# Simulate Render paths
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-print("="*70)
-print("SIMULATING RENDER ENVIRONMENT - No Model Files")
-print("="*70)
-
-# Test 1: Import modules
-print("\n1. Testing imports...")
-try:
-    from src.predict import FraudPredictor
-    from src.demo_predictor import DemoFraudPredictor
-    from web.app import get_predictor
-    print("✅ All imports successful")
-except Exception as e:
-    print(f"❌ Import error: {e}")
-    sys.exit(1)
-
-# Test 2: Initialize predictor (simulating missing model)
-print("\n2. Testing predictor initialization...")
-try:
-    # Temporarily hide model files
-    model_backup = None
-    scaler_backup = None
-    
-    model_path = "models/fraud_detection_model.h5"
-    scaler_path = "models/scaler.pkl"
-    
-    if os.path.exists(model_path):
-        model_backup = model_path + ".hidden"
-        os.rename(model_path, model_backup)
-        print(f"   Hidden model file: {model_path}")
-    
-    if os.path.exists(scaler_path):
-        scaler_backup = scaler_path + ".hidden"
-        os.rename(scaler_path, scaler_backup)
-        print(f"   Hidden scaler file: {scaler_path}")
-    
-    # This is what happens on Render
-    predictor = FraudPredictor()
-    predictor.load_model_and_scaler()
-    
-    print(f"✅ Predictor initialized")
-    print(f"   Demo mode: {predictor.is_demo_mode}")
-    print(f"   Has demo_predictor: {predictor.demo_predictor is not None}")
-    
-    # Restore files
-    if model_backup and os.path.exists(model_backup):
-        os.rename(model_backup, model_path)
-    if scaler_backup and os.path.exists(scaler_backup):
-        os.rename(scaler_backup, scaler_path)
-    
-except Exception as e:
-    print(f"❌ Predictor initialization error: {e}")
-    import traceback
-    traceback.print_exc()
-    
-    # Restore files on error
-    if model_backup and os.path.exists(model_backup):
-        os.rename(model_backup, model_path)
-    if scaler_backup and os.path.exists(scaler_backup):
-        os.rename(scaler_backup, scaler_path)
-    sys.exit(1)
-
-# Test 3: Make a prediction
-print("\n3. Testing prediction...")
-try:
-    test_transaction = {f'V{i}': 0.5 for i in range(1, 29)}
-    test_transaction['Amount'] = 150.0
-    test_transaction['Time'] = 43200.0
-    
-    result = predictor.predict_single(test_transaction)
-    
-    print(f"✅ Prediction successful")
-    print(f"   Is Fraud: {result['is_fraud']}")
-    print(f"   Probability: {result['fraud_probability']:.4f}")
-    print(f"   Risk Level: {result['risk_level']}")
-    print(f"   Demo Mode: {result.get('demo_mode', False)}")
-    
-except Exception as e:
-    print(f"❌ Prediction error: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
-
-# Test 4: Test get_predictor() from Flask app
-print("\n4. Testing Flask get_predictor() function...")
-try:
-    # Reset global predictor
-    import web.app as app_module
-    app_module.predictor = None
-    
-    # Hide files again
-    if os.path.exists(model_path):
-        model_backup = model_path + ".hidden"
-        os.rename(model_path, model_backup)
-    if os.path.exists(scaler_path):
-        scaler_backup = scaler_path + ".hidden"
-        os.rename(scaler_path, scaler_backup)
-    
-    # Call get_predictor (what Flask does)
-    pred = get_predictor()
-    
-    print(f"✅ get_predictor() successful")
-    print(f"   Demo mode: {pred.is_demo_mode}")
-    print(f"   Ready for predictions: {pred.demo_predictor is not None or pred.model is not None}")
-    
-    # Restore files
-    if model_backup and os.path.exists(model_backup):
-        os.rename(model_backup, model_path)
-    if scaler_backup and os.path.exists(scaler_backup):
-        os.rename(scaler_backup, scaler_path)
-    
-except Exception as e:
-    print(f"❌ get_predictor() error: {e}")
-    import traceback
-    traceback.print_exc()
-    
-    # Restore files
-    if model_backup and os.path.exists(model_backup):
-        os.rename(model_backup, model_path)
-    if scaler_backup and os.path.exists(scaler_backup):
-        os.rename(scaler_backup, scaler_path)
-    sys.exit(1)
-
-print("\n" + "="*70)
-print("✅ ALL TESTS PASSED - App will work on Render!")
-print("="*70)
-print("\nThe app is bulletproof and will:")
-print("  1. Start without errors ✅")
-print("  2. Switch to demo mode automatically ✅")
-print("  3. Handle predictions correctly ✅")
-print("  4. Never crash ✅")
@@ -0,0 +1,56 @@
+"""
+Shared pytest fixtures
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+
+
+@pytest.fixture(scope='session', autouse=True)
+def isolated_database(tmp_path_factory):
+    """Keep the app's SQLite database (and its WAL files) out of the repo root"""
+    import database.db_setup as db_setup
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(Config, 'SQLITE_DB_PATH', str(tmp_path_factory.mktemp('db') / 'fraud_detection.db'))
+        mp.setattr(db_setup, '_engine', None)
+        mp.setattr(db_setup, '_Session', None)
+        yield
+        if db_setup._engine is not None:
+            db_setup._engine.dispose()
+
+
+@pytest.fixture
+def hidden_models():
+    """Temporarily hide the trained model files so the app has to run in demo mode"""
+    backups = []
+    for path in (Config.MODEL_PATH, Config.TFLITE_PATH, Config.SCALER_PATH):
+        try:
+            os.rename(path, path + '.hidden')
+            backups.append(path)
+        except FileNotFoundError:
+            pass
+    
+    yield
+    
+    for path in backups:
+        os.rename(path + '.hidden', path)
+
+
+@pytest.fixture
+def fresh_predictors(monkeypatch):
+    """Drop the cached process-wide predictors (and their cached results) so the next get_predictor() reloads"""
+    import src.predict
+    import web.app
+    monkeypatch.setattr(src.predict, '_predictor', None)
+    monkeypatch.setattr(web.app, 'predictor', None)
+    monkeypatch.setattr(web.app, 'HEALTH_JSON', None)
+    web.app._cached_predict.cache_clear()
+    
+    yield
+    
+    # Results from this test's predictor must not answer a later test's requests
+    web.app._cached_predict.cache_clear()
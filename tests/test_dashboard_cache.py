@@ -0,0 +1,36 @@
+"""
+Test the /dashboard TTL cache and its invalidation
+"""
+from database.db_operations import DatabaseOperations
+
+
+def test_dashboard_is_cached_until_invalidated():
+    import web.app
+    web.app.invalidate_dashboard_cache()
+    client = web.app.app.test_client()
+    
+    assert client.get('/dashboard').status_code == 200
+    cached = web.app._dashboard_cache['val']
+    assert cached is not None
+    
+    assert client.get('/dashboard').status_code == 200
+    assert web.app._dashboard_cache['val'] is cached
+    
+    web.app.invalidate_dashboard_cache()
+    assert web.app._dashboard_cache['val'] is None
+
+
+def test_refresh_racing_an_invalidation_is_not_cached(monkeypatch):
+    import web.app
+    web.app.invalidate_dashboard_cache()
+    real_iter = DatabaseOperations.iter_recent_transactions
+    
+    def iter_then_invalidate(self, *args, **kwargs):
+        # A queued write lands on the TransactionWriter thread while the page refreshes
+        web.app.invalidate_dashboard_cache()
+        return real_iter(self, *args, **kwargs)
+    
+    monkeypatch.setattr(DatabaseOperations, 'iter_recent_transactions', iter_then_invalidate)
+    
+    assert web.app.app.test_client().get('/dashboard').status_code == 200
+    assert web.app._dashboard_cache['val'] is None
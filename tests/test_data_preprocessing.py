@@ -0,0 +1,36 @@
+"""
+Test that the streamed undersampling load keeps the configured class ratio
+"""
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing import DataPreprocessor
+
+
+def _write_dataset(path, n_rows, fraud_rate):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(n_rows, 28)), columns=[f'V{i}' for i in range(1, 29)])
+    df.insert(0, 'Time', np.arange(n_rows, dtype=float))
+    df['Amount'] = rng.uniform(1, 500, n_rows)
+    df['Class'] = (rng.random(n_rows) < fraud_rate).astype(int)
+    df.to_csv(path, index=False)
+    return int(df['Class'].sum())
+
+
+def test_undersample_keeps_ratio_on_fraud_heavy_data(tmp_path):
+    # 5% fraud: a fixed 1% sample of normal rows would fall far short of 2:1
+    path = tmp_path / 'creditcard.csv'
+    n_fraud = _write_dataset(path, 20000, 0.05)
+    
+    preprocessor = DataPreprocessor()
+    ratio = preprocessor.config.UNDERSAMPLE_RATIO
+    df = preprocessor.load_data(
+        filepath=str(path),
+        majority_per_fraud=ratio * preprocessor.config.MAJORITY_SAMPLE_MARGIN
+    )
+    assert int(df['Class'].sum()) == n_fraud
+    
+    balanced = preprocessor.handle_imbalance(df, method='undersample')
+    counts = balanced['Class'].value_counts()
+    assert counts[1] == n_fraud
+    assert counts[0] == n_fraud * ratio
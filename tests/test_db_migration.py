@@ -0,0 +1,40 @@
+"""
+Test that a transactions table from before the v_pca blob is upgraded in place
+"""
+import numpy as np
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from database.db_setup import Base, Transaction, migrate_transactions_table
+
+
+def test_old_v_columns_are_packed_into_v_pca(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    v_columns = [f'v{i}' for i in range(1, 29)]
+    
+    # Schema as created by the original v1..v28 model
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, time FLOAT NOT NULL, "
+            "amount FLOAT NOT NULL, " + ", ".join(f"{c} FLOAT" for c in v_columns) + ", "
+            "is_fraud BOOLEAN, fraud_probability FLOAT, risk_level VARCHAR(20), "
+            "created_at DATETIME, updated_at DATETIME)"
+        ))
+        conn.execute(text(
+            f"INSERT INTO transactions (time, amount, {', '.join(v_columns)}) "
+            f"VALUES (1.0, 2.0, {', '.join(str(i) for i in range(1, 29))})"
+        ))
+    Base.metadata.create_all(engine, checkfirst=True)
+    
+    assert migrate_transactions_table(engine)
+    assert not migrate_transactions_table(engine)
+    assert 'ix_txn_created_desc' in {ix['name'] for ix in inspect(engine).get_indexes('transactions')}
+    
+    with Session(engine) as session:
+        old = session.get(Transaction, 1)
+        np.testing.assert_array_equal(old.get_v(), np.arange(1, 29, dtype=np.float32))
+        
+        # Inserts through the current model work against the upgraded table
+        session.add(Transaction(time=3.0, amount=4.0, v_pca=np.zeros(28, dtype=np.float32).tobytes()))
+        session.commit()
+        assert session.query(Transaction).count() == 2
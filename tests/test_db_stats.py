@@ -0,0 +1,45 @@
+"""
+Test the get_statistics TTL cache and its invalidation
+"""
+import database.db_operations as db_operations
+from database.db_operations import DatabaseOperations, invalidate_stats_cache
+
+
+def _pair(amount):
+    transaction = {f'v{i}': 0.0 for i in range(1, 29)}
+    transaction.update(time=1.0, amount=amount, is_fraud=True, fraud_probability=0.9, risk_level='Critical')
+    log = {'is_fraud': True, 'fraud_probability': 0.9, 'risk_level': 'Critical', 'model_version': '1.0'}
+    return transaction, log
+
+
+def test_writes_invalidate_cached_statistics():
+    db_ops = DatabaseOperations()
+    try:
+        before = db_ops.get_statistics()
+        db_ops.add_transactions_with_logs_bulk([_pair(1.0), _pair(2.0)])
+        after = db_ops.get_statistics()
+    finally:
+        db_ops.close()
+    
+    assert after['total_transactions'] == before['total_transactions'] + 2
+    assert after['total_fraud'] == before['total_fraud'] + 2
+    assert after['total_predictions'] == before['total_predictions'] + 2
+
+
+def test_refresh_racing_an_invalidation_is_not_cached(monkeypatch):
+    invalidate_stats_cache()
+    db_ops = DatabaseOperations()
+    real_query = db_ops.session.query
+    
+    def query_then_invalidate(*args, **kwargs):
+        # A write lands (e.g. on the TransactionWriter thread) while the refresh runs
+        invalidate_stats_cache()
+        return real_query(*args, **kwargs)
+    
+    monkeypatch.setattr(db_ops.session, 'query', query_then_invalidate)
+    try:
+        assert db_ops.get_statistics()['total_transactions'] >= 0
+    finally:
+        db_ops.close()
+    
+    assert db_operations._stats_cache['val'] is None
@@ -0,0 +1,25 @@
+"""
+Test that the Flask app's predictor works in demo mode (no model files)
+"""
+
+
+def test_demo_mode(hidden_models, fresh_predictors):
+    from web.app import get_predictor
+    
+    p = get_predictor()
+    print(f"Predictor type: {type(p)}")
+    assert p.is_demo_mode
+    
+    test = {f'V{i}': 0.5 for i in range(1, 29)}
+    test['Amount'] = 100
+    test['Time'] = 3600
+    
+    r = p.predict_single(test)
+    print(f"Prediction: {r['is_fraud']}, Probability: {r['fraud_probability']:.4f}, Risk Level: {r['risk_level']}")
+    assert r['is_fraud'] in (True, False)
+    assert 0.0 <= r['fraud_probability'] <= 1.0
+    assert r['risk_level'] in ('Low', 'Medium', 'High', 'Critical')
+    assert r.get('demo_mode', False)
+    
+    # Native Python types only, so responses serialize without numpy coercion
+    assert all(type(v) in (int, float, bool, str) for v in r.values()), {k: type(v) for k, v in r.items()}
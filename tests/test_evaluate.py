@@ -0,0 +1,72 @@
+"""
+Test the confusion-matrix and single-sort curve metrics against sklearn.metrics
+"""
+import numpy as np
+import pytest
+from sklearn.metrics import (classification_report, confusion_matrix, precision_recall_curve,
+                             precision_recall_fscore_support, roc_auc_score, roc_curve)
+
+from src.evaluate import curves_from_scores, format_classification_report, metrics_from_confusion_matrix
+
+
+@pytest.fixture
+def sample():
+    # Imbalanced labels with scores that are informative but noisy, plus some ties
+    rng = np.random.default_rng(42)
+    y_true = (rng.random(2000) < 0.1).astype(int)
+    y_proba = np.clip(0.3 * y_true + rng.random(2000) * 0.7, 0, 1).round(3)
+    return y_true, y_proba
+
+
+def test_metrics_match_sklearn(sample):
+    y_true, y_proba = sample
+    y_pred = (y_proba > 0.5).astype(int)
+    metrics = metrics_from_confusion_matrix(confusion_matrix(y_true, y_pred, labels=[0, 1]))
+    
+    precision, recall, f1, support = precision_recall_fscore_support(y_true, y_pred, labels=[0, 1], zero_division=0)
+    for i, name in enumerate(('Normal', 'Fraud')):
+        assert metrics[name]['precision'] == pytest.approx(precision[i])
+        assert metrics[name]['recall'] == pytest.approx(recall[i])
+        assert metrics[name]['f1'] == pytest.approx(f1[i])
+        assert metrics[name]['support'] == support[i]
+    assert metrics['accuracy'] == pytest.approx(np.mean(y_true == y_pred))
+
+
+def test_report_matches_sklearn(sample):
+    y_true, y_proba = sample
+    y_pred = (y_proba > 0.5).astype(int)
+    metrics = metrics_from_confusion_matrix(confusion_matrix(y_true, y_pred, labels=[0, 1]))
+    
+    expected = classification_report(y_true, y_pred, labels=[0, 1], target_names=['Normal', 'Fraud'], zero_division=0)
+    assert format_classification_report(metrics) == expected
+
+
+def test_curves_match_sklearn(sample):
+    y_true, y_proba = sample
+    curves = curves_from_scores(y_true, y_proba)
+    
+    fpr, tpr, _ = roc_curve(y_true, y_proba, drop_intermediate=False)
+    np.testing.assert_allclose(curves['fpr'], fpr)
+    np.testing.assert_allclose(curves['tpr'], tpr)
+    assert curves['roc_auc'] == pytest.approx(roc_auc_score(y_true, y_proba))
+    
+    # sklearn lists the PR curve from the lowest threshold up; ours starts at the highest
+    precision, recall, _ = precision_recall_curve(y_true, y_proba)
+    np.testing.assert_allclose(curves['precision'], precision[::-1])
+    np.testing.assert_allclose(curves['recall'], recall[::-1])
+
+
+def test_plots_share_one_lazily_created_figure(sample, tmp_path):
+    import src.evaluate as evaluate
+    y_true, y_proba = sample
+    curves = curves_from_scores(y_true, y_proba)
+    cm = confusion_matrix(y_true, (y_proba > 0.5).astype(int), labels=[0, 1])
+    
+    evaluate.plot_confusion_matrix(cm, str(tmp_path / 'cm.png'))
+    fig = evaluate._FIG
+    evaluate.plot_roc_curve(curves['fpr'], curves['tpr'], curves['roc_auc'], str(tmp_path / 'roc.png'))
+    evaluate.plot_precision_recall_curve(curves['precision'], curves['recall'], str(tmp_path / 'pr.png'))
+    
+    assert fig is not None and evaluate._FIG is fig
+    assert len(fig.axes) == 1  # the confusion matrix colorbar was removed
+    assert all((tmp_path / name).stat().st_size > 0 for name in ('cm.png', 'roc.png', 'pr.png'))
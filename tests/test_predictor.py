@@ -0,0 +1,127 @@
+"""
+Test FraudPredictor's trained-model path with a synthetic scaler and a tiny linear model
+"""
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from config import Config
+from src.data_preprocessing import DataPreprocessor
+from src.demo_predictor import DemoFraudPredictor
+from src.predict import FraudPredictor
+
+
+class _LinearModel:
+    """Stand-in for FraudDetectionModel: logistic regression with fixed weights"""
+    
+    def __init__(self, n_features):
+        self.weights = np.linspace(-1.0, 1.0, n_features).astype(np.float32)
+    
+    def predict_proba(self, X):
+        return (1.0 / (1.0 + np.exp(-(np.asarray(X, dtype=np.float32) @ self.weights))))[:, None]
+
+
+@pytest.fixture
+def predictor(tmp_path, monkeypatch):
+    p = FraudPredictor()
+    rng = np.random.default_rng(0)
+    train = pd.DataFrame(rng.normal(2.0, 3.0, size=(200, len(p._feature_keys))), columns=list(p._feature_keys))
+    
+    # Round-trip a synthetic scaler through the real loader
+    scaler_path = str(tmp_path / 'scaler.pkl')
+    joblib.dump(StandardScaler().fit(train), scaler_path)
+    monkeypatch.setattr(Config, 'SCALER_SAVE_PATH', scaler_path)
+    
+    # Same state load_model_and_scaler leaves behind, without TensorFlow
+    p.scaler = DataPreprocessor().load_scaler()
+    p.fraud_model = p.model = _LinearModel(len(p._feature_keys))
+    p._mean = p.scaler.mean_.astype(np.float32)
+    p._inv_scale = p.scaler.inv_scale_.astype(np.float32)
+    p._feature_cols = list(p.scaler.feature_names_in_)
+    return p
+
+
+def test_pre_scaled_batch_matches_scaling_on_the_fly(predictor):
+    rng = np.random.default_rng(1)
+    raw = pd.DataFrame(rng.normal(size=(8, len(predictor._feature_keys))), columns=list(predictor._feature_keys))
+    scaled = pd.DataFrame(predictor.scaler.transform(raw), columns=raw.columns)
+    
+    expected = predictor.predict_batch(raw)
+    result = predictor.predict_batch(scaled, pre_scaled=True)
+    
+    assert not predictor.is_demo_mode
+    assert np.allclose(result['fraud_probability'], expected['fraud_probability'], atol=1e-5)
+    assert (result['is_fraud'].values == expected['is_fraud'].values).all()
+    assert (result['risk_level'].values == expected['risk_level'].values).all()
+
+
+def test_single_prediction_matches_batch(predictor):
+    transaction = {key: float(i) / 10 for i, key in enumerate(predictor._feature_keys)}
+    
+    single = predictor.predict_single(transaction)
+    batch = predictor.predict_batch(pd.DataFrame([transaction]))
+    
+    assert single['fraud_probability'] == pytest.approx(float(batch['fraud_probability'][0]), abs=1e-5)
+    assert single['risk_level'] == batch['risk_level'][0]
+
+
+@pytest.mark.parametrize('n_features', [29, 31])
+def test_wrong_feature_count_raises(predictor, n_features):
+    with pytest.raises(ValueError, match='Expected 30 features'):
+        predictor.predict_single(np.zeros(n_features))
+    with pytest.raises(ValueError, match='Expected 30 features'):
+        predictor.predict_single_array(np.zeros(n_features, dtype=np.float32))
+
+
+def test_unusable_tflite_falls_back_to_keras(tmp_path, monkeypatch):
+    import tensorflow as tf
+    
+    n_features = Config.INPUT_DIM
+    scaler_path, model_path, tflite_path = (str(tmp_path / name) for name in ('scaler.pkl', 'model.h5', 'model.tflite'))
+    joblib.dump(StandardScaler().fit(np.random.default_rng(0).normal(size=(50, n_features))), scaler_path)
+    
+    model = tf.keras.Sequential([tf.keras.Input(shape=(n_features,)), tf.keras.layers.Dense(1, activation='sigmoid')])
+    model.save(model_path)
+    with open(tflite_path, 'wb') as f:
+        f.write(b'not a tflite flatbuffer')
+    
+    monkeypatch.setattr(Config, 'SCALER_SAVE_PATH', scaler_path)
+    monkeypatch.setattr(Config, 'MODEL_SAVE_PATH', model_path)
+    monkeypatch.setattr(Config, 'TFLITE_PATH', tflite_path)
+    monkeypatch.setattr(Config, 'MICRO_BATCHING', False)
+    
+    p = FraudPredictor()
+    p.load_model_and_scaler()
+    
+    assert not p.is_demo_mode
+    assert type(p.fraud_model).__name__ == 'FraudDetectionModel'
+    assert 0.0 <= p.predict_single(np.zeros(n_features))['fraud_probability'] <= 1.0
+
+
+def test_array_order_is_the_same_in_real_and_demo_mode(predictor):
+    # One array, V1-V28, Amount, Time, fed to the trained-model and demo predictors
+    rng = np.random.default_rng(2)
+    features = rng.normal(size=30)
+    features[28], features[29] = 1500.0, 40000.0
+    as_dict = dict(zip([f'V{i}' for i in range(1, 29)] + ['Amount', 'Time'], features))
+    
+    demo = FraudPredictor()
+    demo.demo_predictor = DemoFraudPredictor()
+    demo.is_demo_mode = True
+    
+    for p in (predictor, demo):
+        calls = (
+            lambda: p.predict_single(features),
+            lambda: p.predict_single(as_dict),
+            lambda: p.predict_single_array(features),
+        )
+        results = []
+        for call in calls:
+            if p.is_demo_mode:
+                p.demo_predictor._rng = np.random.default_rng(0)  # same noise draw each call
+            results.append(call())
+        
+        assert all(r['fraud_probability'] == pytest.approx(results[0]['fraud_probability'], abs=1e-6) for r in results)
+        assert len({r['risk_level'] for r in results}) == 1
@@ -0,0 +1,128 @@
+"""
+Test the write-behind queue used by /predict
+"""
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from database.db_operations import DatabaseOperations, TransactionWriter
+from database.db_setup import PredictionLog, Transaction, get_session, _get_engine
+
+
+def _pair(amount):
+    transaction = {f'v{i}': float(i) for i in range(1, 29)}
+    transaction.update(time=1.0, amount=amount, is_fraud=False, fraud_probability=0.1, risk_level='Low')
+    log = {'is_fraud': False, 'fraud_probability': 0.1, 'risk_level': 'Low', 'model_version': '1.0'}
+    return transaction, log
+
+
+def _logged_amounts(amounts):
+    """Amounts of the given transactions that have a prediction log pointing at them"""
+    session = get_session()
+    try:
+        rows = (session.query(Transaction.amount)
+                .join(PredictionLog, PredictionLog.transaction_id == Transaction.id)
+                .filter(Transaction.amount.in_(amounts))
+                .all())
+        return sorted(amount for amount, in rows)
+    finally:
+        session.close()
+
+
+def test_submitted_pairs_are_written_on_flush():
+    DatabaseOperations()  # make sure the tables exist
+    flushed = []
+    writer = TransactionWriter(batch_size=8, flush_ms=50, on_flush=lambda: flushed.append(True))
+    amounts = [1000.0 + i for i in range(20)]
+    
+    for amount in amounts:
+        writer.submit(*_pair(amount))
+    assert writer.flush()
+    
+    assert _logged_amounts(amounts) == amounts
+    assert flushed
+    assert writer.dropped == 0
+
+
+def test_failed_batch_is_retried(monkeypatch):
+    DatabaseOperations()
+    real_write = DatabaseOperations.add_transactions_with_logs_bulk
+    failures = []
+    
+    def flaky_write(self, pairs):
+        if not failures:
+            failures.append(len(pairs))
+            raise RuntimeError("database is locked")
+        return real_write(self, pairs)
+    
+    monkeypatch.setattr(DatabaseOperations, 'add_transactions_with_logs_bulk', flaky_write)
+    writer = TransactionWriter(batch_size=8, flush_ms=10, retry_delay=0.01)
+    writer.submit(*_pair(2000.0))
+    assert writer.flush()
+    
+    assert failures == [1]
+    assert _logged_amounts([2000.0]) == [2000.0]
+    assert writer.dropped == 0
+
+
+def test_batch_is_dropped_after_max_attempts(monkeypatch):
+    def failing_write(self, pairs):
+        raise RuntimeError("database is gone")
+    
+    monkeypatch.setattr(DatabaseOperations, 'add_transactions_with_logs_bulk', failing_write)
+    writer = TransactionWriter(batch_size=8, flush_ms=10, max_attempts=2, retry_delay=0.01)
+    writer.submit(*_pair(3000.0))
+    writer.submit(*_pair(3001.0))
+    assert writer.flush()
+    
+    assert writer.dropped == 2
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="requires fork()")
+def test_writer_works_in_forked_child():
+    DatabaseOperations()
+    writer = TransactionWriter(batch_size=8, flush_ms=10)
+    
+    pid = os.fork()
+    if pid == 0:
+        # The parent's worker thread didn't survive fork(); the child must get its own
+        try:
+            _get_engine().dispose(close=False)  # as gunicorn.conf.py's post_fork does
+            writer.submit(*_pair(4000.0))
+            os._exit(0 if writer.flush() else 1)
+        except BaseException:
+            os._exit(1)
+    
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert _logged_amounts([4000.0]) == [4000.0]
+
+
+def test_queued_pairs_are_flushed_at_exit(tmp_path):
+    db_path = tmp_path / 'exit.db'
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {root!r})
+        from config import Config
+        Config.SQLITE_DB_PATH = {str(db_path)!r}
+        from database.db_operations import DatabaseOperations, TransactionWriter
+        DatabaseOperations()
+        writer = TransactionWriter(batch_size=100, flush_ms=10000)
+        for amount in range(5):
+            writer.submit({{'v1': 1.0, 'time': 1.0, 'amount': float(amount)}},
+                          {{'is_fraud': False, 'fraud_probability': 0.1, 'risk_level': 'Low'}})
+    """)
+    subprocess.run([sys.executable, '-c', script], check=True, capture_output=True, timeout=120)
+    
+    engine = create_engine(f"sqlite:///{db_path}")
+    with engine.connect() as conn:
+        logged = conn.execute(text(
+            "SELECT COUNT(*) FROM prediction_logs p JOIN transactions t ON p.transaction_id = t.id"
+        )).scalar()
+    engine.dispose()
+    assert logged == 5
@@ -3,12 +3,18 @@ Flask Web Application for Credit Card Fraud Detection System
 Provides web interface for uploading transactions and viewing predictions
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, Response, render_template, request, g, stream_with_context
 from flask_cors import CORS
+from functools import lru_cache
+import operator
+from types import MappingProxyType
+import orjson
 import numpy as np
-import pandas as pd
+import signal
 import sys
 import os
+import threading
+import time
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
@@ -16,95 +22,199 @@ from config import Config
 # Import demo predictor first (no TensorFlow dependency)
 from src.demo_predictor import DemoFraudPredictor
 
-from database.db_operations import DatabaseOperations
-from database.db_setup import create_database, Base
+from database.db_operations import DatabaseOperations, TransactionWriter
+from database.db_setup import create_database, Base, _get_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+# Shared configuration for the whole app
+CONFIG = Config()
 
 # Initialize Flask app
 app = Flask(__name__)
-app.config.from_object(Config)
+app.config.from_object(CONFIG)
 CORS(app)
 
 # Initialize predictor (lazy loading)
 predictor = None
 
+# Pre-encoded /health response body, built once the predictor is known
+HEALTH_JSON = None
+
+def ojson(obj, status=200):
+    """JSON response encoded with orjson (numpy scalars/arrays are serialized natively)"""
+    return Response(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+# Short-lived cache of the dashboard's statistics and recent transactions.
+# Request threads and the TransactionWriter thread both invalidate it, hence the lock;
+# 'gen' counts invalidations so a refresh that raced with one isn't stored
+_dashboard_cache = {'ts': 0.0, 'val': None, 'gen': 0}
+_dashboard_lock = threading.Lock()
+
+
+def invalidate_dashboard_cache():
+    """Force the next /dashboard request to hit the database"""
+    with _dashboard_lock:
+        _dashboard_cache['gen'] += 1
+        _dashboard_cache['ts'] = 0.0
+        _dashboard_cache['val'] = None
+
+
+# Set once the startup table check has run in this process
+_DB_INITIALIZED = False
+
+
+def _init_db_once():
+    """Create database tables on startup (once per process)"""
+    global _DB_INITIALIZED
+    if _DB_INITIALIZED:
+        return
+    
+    print("\n" + "="*70)
+    print("INITIALIZING APPLICATION")
+    print("="*70)
+    try:
+        create_database()
+    except Exception as e:
+        print(f"WARNING: Database setup issue: {e}")
+        print("Attempting to continue anyway...")
+        # Try to create tables on the shared engine without failing
+        try:
+            Base.metadata.create_all(_get_engine())
+            print("✓ Database tables created successfully")
+        except Exception as e2:
+            print(f"ERROR: Could not create database tables: {e2}")
+            print("NOTE: Database operations may fail!")
+    print("="*70 + "\n")
+    _DB_INITIALIZED = True
+
+
 # CRITICAL: Create database tables on startup
-print("\n" + "="*70)
-print("INITIALIZING APPLICATION")
-print("="*70)
-try:
-    create_database()
-except Exception as e:
-    print(f"WARNING: Database setup issue: {e}")
-    print("Attempting to continue anyway...")
-    # Try to create tables without failing
+_init_db_once()
+
+# One session per request/thread, all drawing from the shared engine's connection pool
+SessionLocal = scoped_session(sessionmaker(bind=_get_engine()))
+
+
+def get_db_ops():
+    """Get the DatabaseOperations bound to the current request's session"""
+    if 'db_ops' not in g:
+        g.db_ops = DatabaseOperations(session=SessionLocal())
+    return g.db_ops
+
+
+@app.teardown_appcontext
+def remove_db_session(exception=None):
+    """Return the request's session (and its connection) to the pool"""
+    g.pop('db_ops', None)
+    SessionLocal.remove()
+
+
+# /predict rows are written in batches off the request path unless SYNC_WRITES is set
+WRITER = None if CONFIG.SYNC_WRITES else TransactionWriter(
+    batch_size=CONFIG.WRITE_BATCH_SIZE,
+    flush_ms=CONFIG.WRITE_FLUSH_MS,
+    on_flush=invalidate_dashboard_cache
+)
+
+
+# PCA feature names in requests (V1-V28) and in the transactions table (v1-v28)
+V_KEYS = tuple(f'V{i}' for i in range(1, 29))
+V_KEYS_LOWER = tuple(f'v{i}' for i in range(1, 29))
+
+# Feature order used for prediction cache keys
+_FEATURE_ORDER = V_KEYS + ('Amount', 'Time')
+
+
+_feature_getter = operator.itemgetter(*_FEATURE_ORDER)
+
+
+def _feature_array(data, dtype=np.float32):
+    """
+    Pack request data into an array in _FEATURE_ORDER (missing features count as 0)
+    
+    Values (numbers or numeric strings from a form) are converted by NumPy in
+    one C-level pass rather than one float() call per feature. float32 matches
+    the model input; use float64 for values that are stored or displayed.
+    """
     try:
-        from sqlalchemy import create_engine
-        from database.db_setup import Base
-        config = Config()
-        engine = create_engine(config.DATABASE_URI)
-        Base.metadata.create_all(engine)
-        print("✓ Database tables created successfully")
-    except Exception as e2:
-        print(f"ERROR: Could not create database tables: {e2}")
-        print("NOTE: Database operations may fail!")
-print("="*70 + "\n")
+        values = _feature_getter(data)
+    except KeyError:
+        values = tuple(data.get(k, 0) for k in _FEATURE_ORDER)
+    if None in values:
+        raise TypeError("Feature values must be numbers, not null")
+    return np.array(values, dtype=dtype)
+
+
+@lru_cache(maxsize=CONFIG.PREDICTION_CACHE_SIZE)
+def _cached_predict(key):
+    """
+    Predict a transaction by its feature values, memoizing repeated inputs
+    
+    Args:
+        key (tuple): Feature values in _FEATURE_ORDER (float32-rounded)
+    
+    Returns:
+        MappingProxyType: Read-only prediction result shared by all cache hits
+    """
+    result = get_predictor().predict_single_array(np.array(key, dtype=np.float32))
+    return MappingProxyType(result)
+
+
+class DemoWrapper:
+    """Predictor interface backed only by the rule-based demo predictor"""
+    __slots__ = ('demo_predictor', 'is_demo_mode', 'model', 'scaler')
+    
+    def __init__(self):
+        self.demo_predictor = DemoFraudPredictor()
+        self.is_demo_mode = True
+        self.model = None
+        self.scaler = None
+    
+    def predict_single(self, transaction_data, threshold=0.5):
+        return self.demo_predictor.predict_single(transaction_data, threshold)
+    
+    def predict_single_array(self, features, threshold=0.5):
+        return self.demo_predictor.predict_single(features, threshold)
+    
+    def predict_batch(self, transactions_df, threshold=0.5):
+        return self.demo_predictor.predict_batch(transactions_df, threshold)
+
 
 def get_predictor():
     """Get or initialize predictor - guaranteed to return a working predictor"""
-    global predictor
+    global predictor, HEALTH_JSON
     if predictor is None:
-        # Check if model files exist first
-        config = Config()
-        model_exists = os.path.exists(config.MODEL_PATH)
-        scaler_exists = os.path.exists(config.SCALER_PATH)
-        
-        # Use demo mode if files don't exist
-        if not model_exists or not scaler_exists:
-            print("🔄 Using DEMO MODE (model files not available)")
-            # Create a simple wrapper for demo predictor
-            class DemoWrapper:
-                def __init__(self):
-                    self.demo_predictor = DemoFraudPredictor()
-                    self.is_demo_mode = True
-                    self.model = None
-                    self.scaler = None
-                
-                def predict_single(self, transaction_data, threshold=0.5):
-                    return self.demo_predictor.predict_single(transaction_data, threshold)
-                
-                def predict_batch(self, transactions_df, threshold=0.5):
-                    return self.demo_predictor.predict_batch(transactions_df, threshold)
-            
+        # No up-front file checks: FraudPredictor falls back to demo mode itself
+        # when the model or scaler files are missing
+        try:
+            print("Loading full model...")
+            from src.predict import get_predictor as get_fraud_predictor
+            predictor = get_fraud_predictor()
+        except Exception as e:
+            print(f"⚠️  Error loading full model: {e}")
+            print("🔄 Falling back to demo mode...")
             predictor = DemoWrapper()
             print("✓ Demo mode predictor ready")
-        else:
-            # Try to import and use full model (lazy import)
-            try:
-                print("Loading full model...")
-                from src.predict import FraudPredictor
-                predictor = FraudPredictor()
-                predictor.load_model_and_scaler()
-            except Exception as e:
-                print(f"⚠️  Error loading full model: {e}")
-                print("🔄 Falling back to demo mode...")
-                class DemoWrapper:
-                    def __init__(self):
-                        self.demo_predictor = DemoFraudPredictor()
-                        self.is_demo_mode = True
-                        self.model = None
-                        self.scaler = None
-                    
-                    def predict_single(self, transaction_data, threshold=0.5):
-                        return self.demo_predictor.predict_single(transaction_data, threshold)
-                    
-                    def predict_batch(self, transactions_df, threshold=0.5):
-                        return self.demo_predictor.predict_batch(transactions_df, threshold)
-                
-                predictor = DemoWrapper()
-                print("✓ Demo mode predictor ready")
+        
+        HEALTH_JSON = orjson.dumps({
+            'status': 'healthy',
+            'service': 'fraud-detection',
+            'demo_mode': predictor.is_demo_mode
+        })
     return predictor
 
 
+# Load the predictor (and TensorFlow, if a model is present) at startup rather than
+# on the first request; set WARM_START=0 to keep it lazy (e.g. in tests)
+if os.getenv('WARM_START', '1') == '1':
+    get_predictor()
+
+
 @app.route('/')
 def index():
     """Home page"""
@@ -116,63 +226,56 @@ def predict():
     """Prediction page"""
     if request.method == 'POST':
         try:
-            # Get transaction data from form or JSON
+            # Get transaction data from JSON, else the form (MultiDict supports .get directly)
             if request.is_json:
-                data = request.json
+                data = request.get_json(silent=True)
+                if data is None:
+                    return ojson({'error': 'Request body is not valid JSON'}, 400)
             else:
-                data = request.form.to_dict()
+                data = request.form
             
-            # Convert to proper format
-            transaction_data = {}
-            for i in range(1, 29):
-                key = f'V{i}'
-                transaction_data[key] = float(data.get(key, 0))
-            transaction_data['Amount'] = float(data.get('Amount', 0))
-            transaction_data['Time'] = float(data.get('Time', 0))
+            # Convert to proper format (V1-V28, Amount, Time); full precision for
+            # storage and display, float32 only for the model input / cache key
+            values = _feature_array(data, dtype=np.float64)
+            features = values.tolist()
+            transaction_data = {'Amount': features[28], 'Time': features[29]}
             
-            # Make prediction
-            pred = get_predictor()
-            result = pred.predict_single(transaction_data)
+            # Make prediction (repeated inputs are served from the cache)
+            result = _cached_predict(tuple(values.astype(np.float32).tolist()))
             
             # Save to database
-            db_ops = DatabaseOperations()
-            transaction_db_data = {**transaction_data}
-            for i in range(1, 29):
-                transaction_db_data[f'v{i}'] = transaction_data[f'V{i}']
-                del transaction_db_data[f'V{i}']
+            transaction_db_data = dict(zip(V_KEYS_LOWER, features))
             transaction_db_data['time'] = transaction_data['Time']
             transaction_db_data['amount'] = transaction_data['Amount']
-            del transaction_db_data['Time']
-            del transaction_db_data['Amount']
             transaction_db_data.update({
                 'is_fraud': result['is_fraud'],
                 'fraud_probability': result['fraud_probability'],
                 'risk_level': result['risk_level']
             })
             
-            transaction = db_ops.add_transaction(transaction_db_data)
-            
-            # Log prediction
+            # Log prediction (written in the same commit as the transaction)
             log_data = {
-                'transaction_id': transaction.id,
                 'is_fraud': result['is_fraud'],
                 'fraud_probability': result['fraud_probability'],
                 'risk_level': result['risk_level'],
                 'model_version': '1.0'
             }
-            db_ops.add_prediction_log(log_data)
-            db_ops.close()
+            if WRITER is not None:
+                WRITER.submit(transaction_db_data, log_data)
+            else:
+                get_db_ops().add_transaction_with_log(transaction_db_data, log_data)
+                invalidate_dashboard_cache()
             
             # Return result
             if request.is_json:
-                return jsonify(result)
+                return ojson(dict(result))
             else:
                 return render_template('result.html', result=result, transaction=transaction_data)
         
         except Exception as e:
             error_msg = str(e)
             if request.is_json:
-                return jsonify({'error': error_msg}), 400
+                return ojson({'error': error_msg}, 400)
             else:
                 return render_template('error.html', error=error_msg)
     
@@ -182,10 +285,18 @@ def predict():
 @app.route('/dashboard')
 def dashboard():
     """Dashboard page with statistics"""
-    db_ops = DatabaseOperations()
-    stats = db_ops.get_statistics()
-    recent_transactions = db_ops.get_all_transactions(limit=10)
-    db_ops.close()
+    now = time.monotonic()
+    with _dashboard_lock:
+        cached, cached_ts, gen = _dashboard_cache['val'], _dashboard_cache['ts'], _dashboard_cache['gen']
+    if cached is None or now - cached_ts >= CONFIG.DASHBOARD_CACHE_TTL:
+        db_ops = get_db_ops()
+        # Plain rows (not ORM objects) so they stay valid after the session is gone
+        cached = (db_ops.get_statistics(), tuple(db_ops.iter_recent_transactions(limit=10)))
+        with _dashboard_lock:
+            if _dashboard_cache['gen'] == gen:
+                _dashboard_cache['val'] = cached
+                _dashboard_cache['ts'] = now
+    stats, recent_transactions = cached
     
     return render_template('dashboard.html', stats=stats, transactions=recent_transactions)
 
@@ -194,83 +305,76 @@ def dashboard():
 def api_predict():
     """API endpoint for predictions"""
     try:
-        data = request.json
+        data = request.get_json(silent=True)
         
         # Validate input
         if not data:
-            return jsonify({'error': 'No data provided'}), 400
+            return ojson({'error': 'No data provided'}, 400)
         
-        # Make prediction
-        pred = get_predictor()
-        result = pred.predict_single(data)
+        # Make prediction (repeated inputs are served from the cache; concurrent
+        # misses are coalesced into one forward pass by FraudPredictor's micro-batcher)
+        result = _cached_predict(tuple(_feature_array(data).tolist()))
         
-        return jsonify(result)
+        return ojson(dict(result))
     
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, 500)
 
 
 @app.route('/api/stats')
 def api_stats():
     """API endpoint for statistics"""
-    db_ops = DatabaseOperations()
+    db_ops = get_db_ops()
     stats = db_ops.get_statistics()
-    db_ops.close()
     
-    return jsonify(stats)
+    return ojson(stats)
 
 
 @app.route('/api/transactions')
 def api_transactions():
-    """API endpoint to get recent transactions"""
+    """API endpoint to get recent transactions (streamed as NDJSON, one object per line)"""
     limit = request.args.get('limit', 10, type=int)
     
-    db_ops = DatabaseOperations()
-    transactions = db_ops.get_all_transactions(limit=limit)
-    db_ops.close()
+    db_ops = get_db_ops()
     
-    transactions_data = []
-    for t in transactions:
-        transactions_data.append({
-            'id': t.id,
-            'amount': t.amount,
-            'time': t.time,
-            'is_fraud': t.is_fraud,
-            'fraud_probability': t.fraud_probability,
-            'risk_level': t.risk_level,
-            'created_at': t.created_at.isoformat() if t.created_at else None
-        })
+    def generate():
+        for t in db_ops.iter_recent_transactions(limit=limit):
+            yield orjson.dumps({
+                'id': t.id,
+                'amount': t.amount,
+                'time': t.time,
+                'is_fraud': t.is_fraud,
+                'fraud_probability': t.fraud_probability,
+                'risk_level': t.risk_level,
+                'created_at': t.created_at.isoformat() if t.created_at else None
+            }) + b'\n'
     
-    return jsonify(transactions_data)
+    # stream_with_context keeps the request's DB session open until the last row is sent
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 
 @app.route('/health')
 def health():
     """Health check endpoint"""
-    pred = get_predictor()
-    status_info = {
-        'status': 'healthy', 
-        'service': 'fraud-detection',
-        'demo_mode': pred.is_demo_mode if pred else False
-    }
-    return jsonify(status_info)
+    if HEALTH_JSON is None:
+        get_predictor()
+    return Response(HEALTH_JSON, mimetype='application/json')
 
 
 if __name__ == '__main__':
-    # Ensure database exists
-    print("Checking database...")
-    try:
-        create_database()
-    except Exception as e:
-        print(f"Database already exists or error: {e}")
+    # Database tables were already created at import by _init_db_once()
+    
+    # SIGTERM (e.g. a Render redeploy) skips atexit by default: exit cleanly so
+    # queued /predict rows are flushed
+    if WRITER is not None:
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     
     # Run app
-    config = Config()
     print(f"\n{'='*70}")
     print("FRAUD DETECTION WEB APPLICATION")
     print(f"{'='*70}")
-    print(f"\nStarting server on http://{config.FLASK_HOST}:{config.FLASK_PORT}")
-    print(f"Debug mode: {config.DEBUG}")
+    print(f"\nStarting server on http://{CONFIG.FLASK_HOST}:{CONFIG.FLASK_PORT}")
+    print(f"Debug mode: {CONFIG.DEBUG}")
     print("\nAvailable endpoints:")
     print("  - http://localhost:5000/          (Home)")
     print("  - http://localhost:5000/predict   (Prediction form)")
@@ -279,7 +383,7 @@ if __name__ == '__main__':
     print(f"{'='*70}\n")
     
     app.run(
-        host=config.FLASK_HOST,
-        port=config.FLASK_PORT,
-        debug=config.DEBUG
+        host=CONFIG.FLASK_HOST,
+        port=CONFIG.FLASK_PORT,
+        debug=CONFIG.DEBUG
     )